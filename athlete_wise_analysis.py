@@ -0,0 +1,103 @@
+import streamlit as st
+import plotly.express as px
+import density
+import figure_cache
+import helper
+
+def athlete_wise_analysis(data):
+    st.title("Athlete-wise Analysis")
+
+    def build_age_distribution():
+        # Age density curves, precomputed from binned ages per dataset version
+        ages = data.age_density('athletes')
+        curves = [ages.curve(), ages.curve(medal='Gold'), ages.curve(medal='Silver'), ages.curve(medal='Bronze')]
+
+        # Create the distribution plot
+        fig = density.density_figure(
+            curves,
+            ['Overall Age', 'Gold Medal', 'Silver Medal', 'Bronze Medal']
+        )
+
+        # Customize layout and traces
+        fig.update_layout(
+            title_text='Age Distribution of Athletes',
+            title_x=0.5,
+            xaxis_title="Age",
+            yaxis_title="Density",
+            template="plotly_dark",
+            legend_title_text='Medal Type'
+        )
+
+        # Optional: Add marker edge (applies to histograms, not KDE)
+        # fig.update_traces(marker=dict(line=dict(width=2, color='black')))
+        return fig
+
+    # Show the chart
+    figure_cache.plotly_chart(('age_distribution', data.version), build_age_distribution, use_container_width=True)
+    
+    st.subheader("🏅 Age Distribution of Gold Medalists by Sport")
+
+    def build_gold_age_by_sport():
+        # Gold medal rows with a known age, binned by sport
+        ages = data.age_density('df')
+
+        # Select top N sports with most gold medals for clarity (e.g., top 6)
+        top_sports = ages.group_sizes('Sport', medal='Gold').head(6).index.tolist()
+
+        # Plot
+        fig = density.density_figure(
+            [ages.curve(medal='Gold', sport=sport) for sport in top_sports],
+            top_sports
+        )
+
+        fig.update_layout(
+            title="Distribution of Ages for Gold Medalists by Sport",
+            title_x=0.5,
+            xaxis_title="Age",
+            yaxis_title="Density",
+            template="plotly_dark",
+            legend_title_text="Sports"
+        )
+        return fig
+
+    figure_cache.plotly_chart(('gold_age_by_sport', data.version), build_gold_age_by_sport, use_container_width=True)
+    
+    # Weight categories of Gold medalists with a known sex, read from the
+    # precomputed bin counts (categories are set in binning.BIN_SPECS)
+    bins = data.attribute_bins()
+    category_counts = bins.counts('Weight', 'bin', Medal='Gold', Sex=bins.categories['Sex'])
+
+    # Let user select a weight category to view gender split
+    selected_category = st.sidebar.selectbox(
+        "Select Weight Category",
+        category_counts[category_counts > 0].index.tolist()
+    )
+
+    def build_gender_split():
+        # Count Male vs Female in the selected weight category
+        gender_counts = bins.counts('Weight', 'Sex', Medal='Gold', bin=selected_category)
+        gender_counts = gender_counts[gender_counts > 0].sort_values(ascending=False).reset_index()
+        gender_counts.columns = ['Gender', 'Count']
+        gender_counts['Gender'] = gender_counts['Gender'].map({'M': 'Male', 'F': 'Female'})
+
+        # Plot pie chart
+        fig = px.pie(gender_counts,
+                    names='Gender',
+                    values='Count',
+                    title=f"🥇 Gender Distribution in {selected_category}",
+                    color='Gender',
+                    color_discrete_map={'Male': 'royalblue', 'Female': 'deeppink'})
+
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        fig.update_layout(title_x=0.5)
+        return fig
+
+    # Display
+    figure_cache.plotly_chart(('weight_gender_split', selected_category, data.version), build_gender_split, use_container_width=True)
+    
+    selected_sport=st.sidebar.selectbox("Select Sport", data.df['Sport'].unique())
+    st.subheader(f"🏋️‍♂️ Height & Weight Analysis for {selected_sport}")
+    helper.height_weight_analysis(data,selected_sport)
+
+    st.markdown("---")
+    st.info("🔍 Tip: This overview provides a high-level summary of Olympic history!")
@@ -0,0 +1,304 @@
+import argparse
+import os
+import shutil
+import threading
+
+import pandas as pd
+
+import data_cache
+import helper
+import incremental
+import medal_cube
+from preprocessor import DEFAULT_SEASON, MEDAL_EVENT_KEY, MEDALS, SEASONS
+
+# Which engine answers the dashboard's aggregate queries: 'pandas' or 'duckdb'
+BACKEND = os.environ.get("OLYMPIC_BACKEND", "pandas")
+
+# Database files this process has open, never pruned while it runs
+_open_paths = set()
+
+
+class PandasBackend:
+    # The aggregate queries behind the views, answered from the store's
+    # in-memory frame and its row indexes
+
+    name = 'pandas'
+
+    def __init__(self, data):
+        self.data = data
+
+    def appended(self, new_df, version):
+        # Reads through the store, which already holds the new rows
+        return self
+
+    def year_region_counts(self):
+        # Gold/Silver/Bronze/Total medal events by (Year, region)
+        return medal_cube.year_region_counts(self.data.medal_events())
+
+    def over_time(self, col):
+        # Distinct values of col per edition, as columns Edition and count
+        return helper.data_over_time(self.data.df, col, 'count')
+
+    def country_year_list(self):
+        return helper.country_year_list(self.data.df)
+
+    def year_region_sex_counts(self):
+        # Entries and medals per (Year, region, Sex), missing region/sex kept as groups
+        return self.data.df.groupby(['Year', 'region', 'Sex'], observed=True, dropna=False).agg(
+            Count=('Name', 'count'), Medal=('Medal', 'count'))
+
+    def sport_year_events(self):
+        # Distinct events of every sport in every edition, as columns Sport, Year, Event
+        return self.data.df.groupby(['Sport', 'Year'], observed=True)['Event'].nunique().reset_index()
+
+    def sport_athletes(self):
+        # Distinct athlete IDs per sport, as columns Sport and Athletes
+        return self.data.df.groupby('Sport', observed=True)['ID'].nunique().rename('Athletes').reset_index()
+
+    def region_medals_by_year(self, region):
+        # A region's medal events per year, as columns Year and Medal
+        rows = self.data.select('medal_events', region=region, Medal=MEDALS)
+        return rows.groupby('Year')['Medal'].count().reset_index()
+
+    def region_sport_year_medals(self, region):
+        # A region's medal events per (Sport, Year), as columns Sport, Year and Medal
+        rows = self.data.select('medal_events', region=region, Medal=MEDALS)
+        return rows.groupby(['Sport', 'Year'], observed=True)['Medal'].count().reset_index()
+
+    def region_medal_split(self, region):
+        # Medals won by a region's athletes by type, as columns Medal and Count
+        counts = self.data.select('df', region=region, Medal=MEDALS)['Medal'].value_counts()
+        return counts[counts > 0].rename_axis('Medal').rename('Count').reset_index()
+
+    # The same three views for several regions at once: one filter and one
+    # groupby over all of them, with region as the leading column
+
+    def regions_medals_by_year(self, regions):
+        rows = self.data.select('medal_events', region=list(regions), Medal=MEDALS)
+        return rows.groupby(['region', 'Year'], observed=True)['Medal'].count().reset_index()
+
+    def regions_sport_year_medals(self, regions):
+        rows = self.data.select('medal_events', region=list(regions), Medal=MEDALS)
+        return rows.groupby(['region', 'Sport', 'Year'], observed=True)['Medal'].count().reset_index()
+
+    def regions_medal_split(self, regions):
+        rows = self.data.select('df', region=list(regions), Medal=MEDALS)
+        counts = rows.groupby(['region', 'Medal'], observed=True).size().rename('Count').reset_index()
+        # Stable, so ties keep the Gold/Silver/Bronze order within a region
+        return counts.sort_values(['region', 'Count'], ascending=[True, False], kind='stable', ignore_index=True)
+
+
+# Columns of the medal-event table: the dedupe key plus the columns it determines
+_EVENT_COLUMNS = MEDAL_EVENT_KEY + ['region', 'Gold', 'Silver', 'Bronze']
+
+
+def _duckdb():
+    # duckdb is optional and only imported when the duckdb backend is used
+    try:
+        import duckdb
+    except ImportError:
+        raise RuntimeError("OLYMPIC_BACKEND=duckdb needs the duckdb package") from None
+    return duckdb
+
+
+def _sql_column(col):
+    return '"' + col.replace('"', '""') + '"'
+
+
+class DuckDBBackend:
+    # The same queries as PandasBackend, run by DuckDB against a database file
+    # built once per dataset version from the preprocessed frame. The file holds
+    # the athlete rows and the medal-event table, with an index on region.
+
+    name = 'duckdb'
+
+    def __init__(self, path):
+        self.path = path
+        self._con = _duckdb().connect(path, read_only=True)
+        _open_paths.add(path)
+        # A DuckDB connection serves one query at a time
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, df, version):
+        path = os.path.join(data_cache.CACHE_DIR, f"duckdb-{version}.duckdb")
+        if not os.path.exists(path):
+            os.makedirs(data_cache.CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            con = _duckdb().connect(tmp_path)
+            try:
+                _insert(con, df, create=True)
+                con.execute("CREATE INDEX athlete_events_region ON athlete_events (region)")
+                con.execute("CREATE INDEX medal_events_region ON medal_events (region)")
+            finally:
+                con.close()
+            os.replace(tmp_path, path)
+            data_cache.prune(_open_paths | {path}, prefix="duckdb-")
+        return cls(path)
+
+    def appended(self, new_df, version):
+        # A copy of the database file for the new version, with the new rows
+        # inserted. Editions are whole new years, so their medal events cannot
+        # duplicate stored ones.
+        path = os.path.join(data_cache.CACHE_DIR, f"duckdb-{version}.duckdb")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.copyfile(self.path, tmp_path)
+        con = _duckdb().connect(tmp_path)
+        try:
+            _insert(con, new_df, create=False)
+        finally:
+            con.close()
+        os.replace(tmp_path, path)
+        return DuckDBBackend(path)
+
+    def _query(self, sql, *params):
+        with self._lock:
+            return self._con.execute(sql, list(params)).df()
+
+    def year_region_counts(self):
+        cube = self._query("""
+            SELECT Year, region, CAST(SUM(Gold) AS BIGINT) AS Gold, CAST(SUM(Silver) AS BIGINT) AS Silver,
+                   CAST(SUM(Bronze) AS BIGINT) AS Bronze
+            FROM medal_events WHERE region IS NOT NULL
+            GROUP BY Year, region ORDER BY Year, region""").set_index(['Year', 'region'])
+        cube['Total'] = cube['Gold'] + cube['Silver'] + cube['Bronze']
+        return cube[medal_cube.TALLY_COLUMNS]
+
+    def over_time(self, col):
+        # COUNT(DISTINCT) skips NULL, pandas' nunique(dropna=False) counts it once
+        col = _sql_column(col)
+        return self._query(f"""
+            SELECT Year AS Edition, COUNT(DISTINCT {col}) + MAX(CASE WHEN {col} IS NULL THEN 1 ELSE 0 END) AS count
+            FROM athlete_events GROUP BY Year ORDER BY Year""")
+
+    def country_year_list(self):
+        years = self._query("SELECT DISTINCT Year FROM athlete_events ORDER BY Year")['Year'].tolist()
+        country = self._query("""
+            SELECT DISTINCT region FROM athlete_events WHERE region IS NOT NULL ORDER BY region""")['region'].tolist()
+        return ['Overall'] + country, ['Overall'] + years
+
+    def year_region_sex_counts(self):
+        return self._query("""
+            SELECT Year, region, Sex, COUNT(Name) AS Count, COUNT(Medal) AS Medal
+            FROM athlete_events GROUP BY Year, region, Sex
+            ORDER BY Year, region NULLS LAST, Sex NULLS LAST""").set_index(['Year', 'region', 'Sex'])
+
+    def sport_year_events(self):
+        return self._query("""
+            SELECT Sport, Year, COUNT(DISTINCT Event) AS Event
+            FROM athlete_events WHERE Sport IS NOT NULL GROUP BY Sport, Year ORDER BY Sport, Year""")
+
+    def sport_athletes(self):
+        return self._query("""
+            SELECT Sport, COUNT(DISTINCT ID) AS Athletes
+            FROM athlete_events WHERE Sport IS NOT NULL GROUP BY Sport ORDER BY Sport""")
+
+    def region_medals_by_year(self, region):
+        return self._query("""
+            SELECT Year, COUNT(*) AS Medal FROM medal_events
+            WHERE region = ? AND Medal IS NOT NULL GROUP BY Year ORDER BY Year""", region)
+
+    def region_sport_year_medals(self, region):
+        return self._query("""
+            SELECT Sport, Year, COUNT(*) AS Medal FROM medal_events
+            WHERE region = ? AND Medal IS NOT NULL GROUP BY Sport, Year ORDER BY Sport, Year""", region)
+
+    def region_medal_split(self, region):
+        # Ties keep the Gold/Silver/Bronze order, as value_counts does
+        return self._query("""
+            SELECT Medal, COUNT(*) AS Count FROM athlete_events
+            WHERE region = ? AND Medal IS NOT NULL GROUP BY Medal
+            ORDER BY Count DESC, array_position(['Gold', 'Silver', 'Bronze'], Medal)""", region)
+
+    def regions_medals_by_year(self, regions):
+        return self._query("""
+            SELECT region, Year, COUNT(*) AS Medal FROM medal_events
+            WHERE list_contains(?, region) AND Medal IS NOT NULL
+            GROUP BY region, Year ORDER BY region, Year""", list(regions))
+
+    def regions_sport_year_medals(self, regions):
+        return self._query("""
+            SELECT region, Sport, Year, COUNT(*) AS Medal FROM medal_events
+            WHERE list_contains(?, region) AND Medal IS NOT NULL
+            GROUP BY region, Sport, Year ORDER BY region, Sport, Year""", list(regions))
+
+    def regions_medal_split(self, regions):
+        return self._query("""
+            SELECT region, Medal, COUNT(*) AS Count FROM athlete_events
+            WHERE list_contains(?, region) AND Medal IS NOT NULL GROUP BY region, Medal
+            ORDER BY region, Count DESC, array_position(['Gold', 'Silver', 'Bronze'], Medal)""", list(regions))
+
+
+def _insert(con, df, create):
+    # Categoricals are stored as plain strings so that sorting and comparisons
+    # behave like they do on the strings in pandas
+    columns = ', '.join(
+        f"CAST({_sql_column(col)} AS VARCHAR) AS {_sql_column(col)}"
+        if isinstance(df[col].dtype, pd.CategoricalDtype) else _sql_column(col)
+        for col in df.columns)
+    events = ', '.join(_sql_column(col) for col in _EVENT_COLUMNS)
+    into = "CREATE TABLE {} AS" if create else "INSERT INTO {}"
+    con.register('new_rows', df)
+    con.execute(f"{into.format('athlete_events')} SELECT {columns} FROM new_rows")
+    con.execute(f"{into.format('medal_events')} SELECT DISTINCT {events} FROM (SELECT {columns} FROM new_rows)")
+    con.unregister('new_rows')
+
+
+def open_backend(data, name=None):
+    # The configured backend for a store (OLYMPIC_BACKEND unless name is given)
+    name = name or BACKEND
+    if name == 'pandas':
+        return PandasBackend(data)
+    if name == 'duckdb':
+        return DuckDBBackend.build(data.df, data.version)
+    raise ValueError(f"Unknown backend {name!r}, expected 'pandas' or 'duckdb'")
+
+
+def parity_queries(country):
+    # (query, arguments) of every frame-returning query, the per-region ones
+    # for every region of country (country_year_list()[0]) and the
+    # several-region ones for all of them and for the first ten
+    calls = [(query, ()) for query in ['year_region_counts', 'year_region_sex_counts',
+                                       'sport_year_events', 'sport_athletes']]
+    calls += [('over_time', (col,)) for col in helper.OVER_TIME_COLUMNS]
+    calls += [(query, (region,)) for region in country[1:]
+              for query in ['region_medals_by_year', 'region_sport_year_medals', 'region_medal_split']]
+    calls += [(query, (regions,)) for regions in [country[1:], country[1:11]]
+              for query in ['regions_medals_by_year', 'regions_sport_year_medals', 'regions_medal_split']]
+    return calls
+
+
+def assert_same_result(a, b):
+    # Values, column order and dtypes must match; only pandas' categoricals
+    # and DuckDB's strings count as the same type
+    incremental.assert_same_frame(a.reset_index(), b.reset_index(), check_dtype=True)
+
+
+def verify_parity(data, other):
+    # Raises AssertionError unless the store's pandas backend and `other`
+    # return the same frames, dtypes included, for every query
+    reference = PandasBackend(data)
+    country, years = reference.country_year_list()
+    assert (country, years) == other.country_year_list()
+    for query, args in parity_queries(country):
+        assert_same_result(getattr(reference, query)(*args), getattr(other, query)(*args))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that a query backend matches the pandas one")
+    parser.add_argument('athlete_path', nargs='?', default='athlete_events.csv')
+    parser.add_argument('region_path', nargs='?', default='noc_regions.csv')
+    parser.add_argument('--backend', default='duckdb')
+    parser.add_argument('--season', default=DEFAULT_SEASON, choices=SEASONS)
+    args = parser.parse_args()
+
+    import store
+    key = data_cache.cache_key(args.athlete_path, args.region_path, args.season)
+    data = store.DataStore(data_cache.load_preprocessed(args.athlete_path, args.region_path, args.season), key,
+                           args.season)
+    verify_parity(data, open_backend(data, args.backend))
+    print(f"{args.backend} backend matches pandas ({args.season})")
+
+
+if __name__ == '__main__':
+    main()
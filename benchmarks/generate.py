@@ -0,0 +1,252 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Rows of the real athlete_events.csv (Kaggle "120 years of Olympic history", 1896-2016)
+REAL_ROWS = 271_116
+
+# Bump whenever the generated data changes so cached datasets are regenerated
+GENERATOR_VERSION = 1
+
+# Host city of every edition
+SUMMER_GAMES = {
+    1896: 'Athina', 1900: 'Paris', 1904: 'St. Louis', 1906: 'Athina', 1908: 'London', 1912: 'Stockholm',
+    1920: 'Antwerpen', 1924: 'Paris', 1928: 'Amsterdam', 1932: 'Los Angeles', 1936: 'Berlin',
+    1948: 'London', 1952: 'Helsinki', 1956: 'Melbourne', 1960: 'Roma', 1964: 'Tokyo', 1968: 'Mexico City',
+    1972: 'Munich', 1976: 'Montreal', 1980: 'Moskva', 1984: 'Los Angeles', 1988: 'Seoul',
+    1992: 'Barcelona', 1996: 'Atlanta', 2000: 'Sydney', 2004: 'Athina', 2008: 'Beijing',
+    2012: 'London', 2016: 'Rio de Janeiro',
+}
+WINTER_GAMES = {
+    1924: 'Chamonix', 1928: 'Sankt Moritz', 1932: 'Lake Placid', 1936: 'Garmisch-Partenkirchen',
+    1948: 'Sankt Moritz', 1952: 'Oslo', 1956: "Cortina d'Ampezzo", 1960: 'Squaw Valley', 1964: 'Innsbruck',
+    1968: 'Grenoble', 1972: 'Sapporo', 1976: 'Innsbruck', 1980: 'Lake Placid', 1984: 'Sarajevo',
+    1988: 'Calgary', 1992: 'Albertville', 1994: 'Lillehammer', 1998: 'Nagano', 2002: 'Salt Lake City',
+    2006: 'Torino', 2010: 'Vancouver', 2014: 'Sochi',
+}
+
+# sport: (season, events, rows in the real data, team sport)
+SPORTS = {
+    'Athletics': ('Summer', 83, 38624, False), 'Gymnastics': ('Summer', 33, 26707, False),
+    'Swimming': ('Summer', 55, 23195, False), 'Shooting': ('Summer', 83, 11448, False),
+    'Cycling': ('Summer', 44, 10859, False), 'Fencing': ('Summer', 34, 10735, False),
+    'Rowing': ('Summer', 48, 10595, True), 'Wrestling': ('Summer', 74, 7154, False),
+    'Football': ('Summer', 2, 6745, True), 'Sailing': ('Summer', 37, 6586, True),
+    'Equestrianism': ('Summer', 22, 6344, False), 'Canoeing': ('Summer', 37, 6171, True),
+    'Boxing': ('Summer', 28, 6047, False), 'Hockey': ('Summer', 2, 5417, True),
+    'Basketball': ('Summer', 2, 4536, True), 'Weightlifting': ('Summer', 38, 3937, False),
+    'Water Polo': ('Summer', 2, 3846, True), 'Judo': ('Summer', 18, 3801, False),
+    'Handball': ('Summer', 2, 3665, True), 'Art Competitions': ('Summer', 48, 3578, False),
+    'Volleyball': ('Summer', 2, 3404, True), 'Tennis': ('Summer', 16, 2862, False),
+    'Diving': ('Summer', 14, 2842, False), 'Archery': ('Summer', 35, 2334, False),
+    'Table Tennis': ('Summer', 6, 2320, False), 'Modern Pentathlon': ('Summer', 4, 1677, False),
+    'Badminton': ('Summer', 5, 1457, False), 'Synchronized Swimming': ('Summer', 3, 909, True),
+    'Baseball': ('Summer', 1, 894, True), 'Rhythmic Gymnastics': ('Summer', 2, 658, False),
+    'Taekwondo': ('Summer', 8, 600, False), 'Beach Volleyball': ('Summer', 2, 564, True),
+    'Triathlon': ('Summer', 2, 529, False), 'Softball': ('Summer', 1, 478, True),
+    'Rugby Sevens': ('Summer', 2, 299, True), 'Golf': ('Summer', 4, 247, False),
+    'Tug-Of-War': ('Summer', 1, 170, True), 'Rugby': ('Summer', 1, 162, True),
+    'Trampolining': ('Summer', 2, 152, False), 'Polo': ('Summer', 1, 95, True),
+    'Lacrosse': ('Summer', 1, 60, True), 'Cricket': ('Summer', 1, 24, True),
+    'Cross Country Skiing': ('Winter', 24, 9133, False), 'Alpine Skiing': ('Winter', 17, 8829, False),
+    'Speed Skating': ('Winter', 14, 5613, False), 'Ice Hockey': ('Winter', 2, 5516, True),
+    'Biathlon': ('Winter', 11, 4893, False), 'Bobsleigh': ('Winter', 4, 3058, True),
+    'Ski Jumping': ('Winter', 4, 2401, False), 'Figure Skating': ('Winter', 5, 2298, False),
+    'Short Track Speed Skating': ('Winter', 8, 1534, False), 'Luge': ('Winter', 4, 1479, False),
+    'Nordic Combined': ('Winter', 3, 1344, False), 'Freestyle Skiing': ('Winter', 10, 937, False),
+    'Snowboarding': ('Winter', 10, 936, False), 'Curling': ('Winter', 3, 463, True),
+    'Skeleton': ('Winter', 2, 199, False),
+}
+
+# Largest delegations first, in roughly the real order; the rest share the long tail
+LEADING_NOCS = ['USA', 'FRA', 'GBR', 'ITA', 'GER', 'CAN', 'JPN', 'SWE', 'AUS', 'HUN', 'POL', 'SUI',
+                'NED', 'URS', 'FIN', 'ESP', 'CHN', 'RUS', 'AUT', 'NOR', 'KOR', 'ROU', 'TCH', 'BEL',
+                'BRA', 'BUL', 'GDR', 'FRG', 'DEN', 'CUB', 'ARG', 'MEX', 'NZL', 'YUG', 'GRE', 'UKR']
+OTHER_NOCS = (
+    'AFG ALB ALG AND ANG ANT ARM ARU ASA AZE BAH BAN BAR BDI BEN BER BHU BIH BIZ BLR BOL BOT BRN '
+    'BRU BUR CAF CAM CAY CGO CHA CHI CIV CMR COD COK COL COM CPV CRC CRO CYP CZE DJI DMA DOM ECU '
+    'EGY ERI ESA EST ETH FIJ FSM GAB GAM GBS GEO GEQ GHA GRN GUA GUI GUM GUY HAI HKG HON INA IND '
+    'IRI IRL IRQ ISL ISR ISV IVB JAM JOR KAZ KEN KGZ KIR KOS KSA KUW LAO LAT LBA LBR LCA LES LIB '
+    'LIE LTU LUX MAD MAR MAS MAW MDA MDV MGL MHL MKD MLI MLT MNE MON MOZ MRI MTN MYA NAM NCA NEP '
+    'NGR NIG NRU OMA PAK PAN PAR PER PHI PLE PLW PNG POR PRK PUR QAT RSA RWA SAM SEN SEY SGP SKN '
+    'SLE SLO SMR SOL SOM SRB SRI SSD STP SUD SUR SVK SWZ SYR TAN TGA THA TJK TKM TLS TOG TPE TTO '
+    'TUN TUR TUV UAE UGA URU UZB VAN VEN VIE VIN YEM ZAM ZIM EUN EUA SAA SCG BOH ANZ RHO UAR VNM '
+    'YAR YMD NBO NFL CRT WIF MAL ROT IOA UNK'
+).split()
+
+# Historic NOCs that noc_regions.csv folds into a present-day region
+MERGED_NOCS = {'URS': 'RUS', 'EUN': 'RUS', 'GDR': 'GER', 'FRG': 'GER', 'EUA': 'GER', 'SAA': 'GER',
+               'TCH': 'CZE', 'BOH': 'CZE', 'YUG': 'SRB', 'SCG': 'SRB', 'ANZ': 'AUS', 'RHO': 'ZIM',
+               'UAR': 'SYR', 'VNM': 'VIE', 'YAR': 'YEM', 'YMD': 'YEM', 'NBO': 'KEN', 'NFL': 'CAN',
+               'CRT': 'GRE', 'WIF': 'TTO', 'MAL': 'MAS'}
+
+# NOCs without a region (refugee team, independent athletes, unknown)
+NO_REGION_NOCS = ['ROT', 'IOA', 'UNK']
+
+# Average rows per generated athlete, which sets the athlete count for a scale
+ENTRIES_PER_ATHLETE = 1.91
+
+# Athletes per chunk; each chunk is generated and appended to the CSV on its own
+CHUNK_ATHLETES = 200_000
+
+_SYLLABLES = ['an', 'be', 'ca', 'da', 'el', 'fi', 'go', 'ha', 'in', 'jo', 'ka', 'lu', 'ma', 'ni', 'ol',
+              'pe', 'ra', 'si', 'ta', 'ur', 'va', 'wi', 'xe', 'yo', 'za', 'ko', 'mi', 'se', 'to', 're']
+
+
+def dataset_dir(root, scale, seed=0):
+    return os.path.join(root, f"x{scale:g}-seed{seed}-v{GENERATOR_VERSION}")
+
+
+def _names(rng, n, syllables):
+    parts = rng.choice(_SYLLABLES, size=(n, syllables))
+    return pd.Series([''.join(p).capitalize() for p in parts])
+
+
+# Entries per edition in the real data at a few years, interpolated in between
+SUMMER_SIZES = ([1896, 1900, 1920, 1936, 1948, 1960, 1972, 1992, 2016], [380, 1900, 4300, 6500, 6400, 8100, 10300, 13000, 13700])
+WINTER_SIZES = ([1924, 1948, 1964, 1980, 1994, 2014], [460, 1080, 1800, 1750, 3160, 4890])
+
+
+def _editions():
+    # (year, season, city) of every edition, oldest first, with its relative size
+    rows = [(y, 'Summer', c) for y, c in SUMMER_GAMES.items()] + [(y, 'Winter', c) for y, c in WINTER_GAMES.items()]
+    editions = pd.DataFrame(rows, columns=['Year', 'Season', 'City']).sort_values(['Season', 'Year'], ignore_index=True)
+    editions['weight'] = np.where(editions['Season'] == 'Summer',
+                                  np.interp(editions['Year'], *SUMMER_SIZES), np.interp(editions['Year'], *WINTER_SIZES))
+    return editions
+
+
+def noc_regions():
+    nocs = LEADING_NOCS + OTHER_NOCS
+    regions = [None if noc in NO_REGION_NOCS else MERGED_NOCS.get(noc, noc) for noc in nocs]
+    notes = ['Refugee Olympic Team' if noc == 'ROT' else None for noc in nocs]
+    return pd.DataFrame({'NOC': nocs, 'region': regions, 'notes': notes})
+
+
+def athlete_chunk(rng, first_id, n_athletes, regions):
+    editions = _editions()
+    sports = pd.DataFrame.from_dict(SPORTS, orient='index', columns=['Season', 'Events', 'Rows', 'Team'])
+    nocs = regions['NOC'].to_numpy()
+
+    # Delegation sizes follow a power law, strongest NOCs also win more often
+    noc_weight = 1.0 / np.arange(4, len(nocs) + 4) ** 1.1
+    noc_strength = 0.4 + 2.0 * noc_weight / noc_weight[0]
+
+    # Per athlete: sport (weighted by its share of real entries), NOC, sex, body
+    sport_idx = rng.choice(len(sports), size=n_athletes, p=(sports['Rows'] / sports['Rows'].sum()).to_numpy())
+    season = sports['Season'].to_numpy()[sport_idx]
+    noc_idx = rng.choice(len(nocs), size=n_athletes, p=noc_weight / noc_weight.sum())
+
+    # First edition, within the sport's season and weighted by edition size
+    first = np.empty(n_athletes, dtype=np.intp)
+    for s in ('Summer', 'Winter'):
+        mine = np.flatnonzero(season == s)
+        idx = np.flatnonzero(editions['Season'] == s)
+        w = editions['weight'].to_numpy()[idx]
+        first[mine] = rng.choice(idx, size=len(mine), p=w / w.sum())
+    first_year = editions['Year'].to_numpy()[first]
+
+    # Women's share grows from none in 1896 to ~45% in 2016
+    female = rng.random(n_athletes) < np.clip((first_year - 1896) / 120 * 0.45, 0, 0.45)
+    height = np.where(female, rng.normal(168, 8, n_athletes), rng.normal(179, 9, n_athletes)).round()
+    bmi = rng.normal(22.5, 2.5, n_athletes).clip(16, 40)
+    weight = (bmi * (height / 100) ** 2).round()
+    # Heights and weights are mostly missing before 1960
+    missing = rng.random(n_athletes) < np.where(first_year < 1960, 0.75, 0.12)
+    height[missing] = np.nan
+    weight[missing] = np.nan
+    age0 = rng.normal(25, 5, n_athletes).clip(12, 65).round()
+    age0[rng.random(n_athletes) < 0.03] = np.nan
+
+    # ~2 entries per athlete: several events per edition (many for
+    # gymnasts and swimmers) across one or more consecutive editions
+    entries = rng.geometric(0.5, size=n_athletes)
+    multi_event = np.isin(sports.index.to_numpy()[sport_idx], ['Gymnastics', 'Swimming', 'Athletics'])
+    per_games = 1 + rng.poisson(np.where(multi_event, 1.5, 0.3))
+    athlete = np.repeat(np.arange(n_athletes), entries)
+    k = np.arange(len(athlete)) - np.repeat(np.cumsum(entries) - entries, entries)
+    step = k // per_games[athlete]
+    # Entries that would fall after the season's last edition are dropped
+    remaining = (editions.groupby('Season')['Year'].transform('size') - 1
+                 - editions.groupby('Season').cumcount()).to_numpy()
+    keep = step <= remaining[first[athlete]]
+    athlete, step = athlete[keep], step[keep]
+    edition = first[athlete] + step
+
+    # Event: one of the sport's events for the athlete's sex
+    n_events = sports['Events'].to_numpy()[sport_idx][athlete]
+    event_no = rng.integers(0, np.maximum(n_events // 2, 1))
+    sex = np.where(female[athlete], 'F', 'M')
+    sport_name = sports.index.to_numpy()[sport_idx][athlete]
+    event = (pd.Series(sport_name) + np.where(female[athlete], " Women's Event ", " Men's Event ")
+             + pd.Series(event_no).astype(str))
+
+    # Medals: ~15% of entries, more in team sports and for strong NOCs
+    team = sports['Team'].to_numpy()[sport_idx][athlete]
+    p_medal = np.where(team, 0.25, 0.125) * noc_strength[noc_idx][athlete]
+    medal = np.where(rng.random(len(athlete)) < p_medal,
+                     rng.choice(np.array(['Gold', 'Silver', 'Bronze'], dtype=object), size=len(athlete)), None)
+
+    names = _names(rng, n_athletes, 3) + ' ' + _names(rng, n_athletes, 4)
+    noc = nocs[noc_idx][athlete]
+    team_name = regions['region'].fillna(regions['NOC']).to_numpy()[noc_idx][athlete]
+    year = editions['Year'].to_numpy()[edition]
+    season_col = editions['Season'].to_numpy()[edition]
+    return pd.DataFrame({
+        'ID': first_id + athlete,
+        'Name': names.to_numpy()[athlete],
+        'Sex': sex,
+        'Age': age0[athlete] + 4 * step,
+        'Height': height[athlete],
+        'Weight': weight[athlete],
+        'Team': team_name,
+        'NOC': noc,
+        'Games': pd.Series(year).astype(str) + ' ' + season_col,
+        'Year': year,
+        'Season': season_col,
+        'City': editions['City'].to_numpy()[edition],
+        'Sport': sport_name,
+        'Event': event,
+        'Medal': medal,
+    })
+
+
+def generate(out_dir, scale=1.0, seed=0):
+    # Writes athlete_events.csv and noc_regions.csv with about scale x REAL_ROWS
+    # rows, in the real files' format. Returns the paths; existing files are reused.
+    athlete_path = os.path.join(out_dir, 'athlete_events.csv')
+    region_path = os.path.join(out_dir, 'noc_regions.csv')
+    if os.path.exists(athlete_path) and os.path.exists(region_path):
+        return athlete_path, region_path
+
+    os.makedirs(out_dir, exist_ok=True)
+    regions = noc_regions()
+    regions.to_csv(region_path, index=False)
+
+    total_athletes = int(REAL_ROWS * scale / ENTRIES_PER_ATHLETE)
+    tmp_path = f"{athlete_path}.{os.getpid()}.tmp"
+    next_id = 1
+    for chunk_no, start in enumerate(range(0, total_athletes, CHUNK_ATHLETES)):
+        n = min(CHUNK_ATHLETES, total_athletes - start)
+        rng = np.random.default_rng([seed, chunk_no])
+        chunk = athlete_chunk(rng, next_id, n, regions)
+        chunk.to_csv(tmp_path, mode='w' if chunk_no == 0 else 'a', header=chunk_no == 0, index=False, na_rep='NA')
+        next_id += n
+    os.replace(tmp_path, athlete_path)
+    return athlete_path, region_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Olympic dataset")
+    parser.add_argument('--scale', type=float, default=1.0, help="size relative to the real dataset")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=os.path.join('benchmarks', 'data'))
+    args = parser.parse_args()
+    paths = generate(dataset_dir(args.out, args.scale, args.seed), args.scale, args.seed)
+    print('\n'.join(paths))
+
+
+if __name__ == '__main__':
+    main()
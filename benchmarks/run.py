@@ -0,0 +1,312 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+from benchmarks import generate
+
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+
+# Countries the country-page cases render: the ones with the most entries
+COUNTRIES = 5
+
+
+def _store(athlete_path, region_path):
+    # A fresh store (no derived tables yet) over the cached preprocessed frame
+    import data_cache
+    import store
+    version = data_cache.cache_key(athlete_path, region_path)
+    return store.DataStore(data_cache.load_preprocessed(athlete_path, region_path), version)
+
+
+def _fresh_figure_cache(tmp_dir):
+    # Each run starts with empty memory and disk tiers
+    import figure_cache
+    figure_cache.cache = figure_cache.FigureCache(disk_dir=tempfile.mkdtemp(dir=tmp_dir))
+
+
+def cases(athlete_path, region_path, tmp_dir):
+    # (group, name, setup, run): setup() is untimed and returns run's arguments
+    import pandas as pd
+
+    import athlete_wise_analysis
+    import country_wise_analysis
+    import data_cache
+    import helper
+    import medal_cube
+    import overall_analysis
+    import pipelines
+    import preprocessor
+
+    raw = {}
+
+    def read_raw():
+        if not raw:
+            raw['athletes'] = pd.read_csv(athlete_path)
+            raw['regions'] = pd.read_csv(region_path)
+        return raw['athletes'], raw['regions']
+
+    def fresh():
+        return (_store(athlete_path, region_path),)
+
+    def with_cube():
+        data = _store(athlete_path, region_path)
+        cube = data.medal_cube()
+        country, years = data.country_year_list()
+        # Every year overall, every country overall, and the first 50 year/country pairs
+        queries = ([(y, 'Overall') for y in years] + [('Overall', c) for c in country]
+                   + [(y, c) for y in years[1:] for c in country[1:]][:50])
+        return cube, queries
+
+    def top_countries(data):
+        return data.df['region'].value_counts().head(COUNTRIES).index.tolist()
+
+    def with_countries():
+        data = _store(athlete_path, region_path)
+        return data, top_countries(data)
+
+    def render_figures(figure):
+        def run(data, countries):
+            import matplotlib.pyplot as plt
+            for country in countries:
+                fig = figure(data, country)
+                if hasattr(fig, 'savefig'):
+                    plt.close(fig)
+        return run
+
+    def compare_figures(count):
+        def setup():
+            data = _store(athlete_path, region_path)
+            return data, data.country_year_list()[0][1:count + 1]
+
+        def run(data, countries):
+            for name, kind, figure in country_wise_analysis.COMPARE_FIGURES:
+                figure(data, countries)
+        return setup, run
+
+    def serial(run):
+        # The page with every block built in order on the calling thread
+        def run_serial(*args):
+            workers, pipelines.WORKERS = pipelines.WORKERS, 1
+            try:
+                run(*args)
+            finally:
+                pipelines.WORKERS = workers
+        return run_serial
+
+    def page(run):
+        def setup():
+            _fresh_figure_cache(tmp_dir)
+            return fresh()
+        return setup, run
+
+    def with_tallies():
+        cube = with_cube()[0]
+        tallies = [cube.sorted_tally('Overall', 'Overall')] + [cube.sorted_tally(y, 'Overall') for y in cube.by_year]
+        return (tallies,)
+
+    def tally_pages(tallies):
+        # First and last page of every column in both directions
+        for tally in tallies:
+            for column, ascending in tally.orders:
+                tally.page(column, ascending, 1, 25)
+                tally.page(column, ascending, tally.pages(25), 25)
+
+    def medal_tally_page(data):
+        data.country_year_list()
+        data.medal_cube().sorted_tally('Overall', 'Overall').page('Gold', False, 1, 25)
+
+    def country_page(data):
+        country = top_countries(data)[0]
+        country_wise_analysis.country_wise_analysis(data, country)
+        country_wise_analysis.country_sport_heatmap(data, country)
+        country_wise_analysis.most_successful_athlete(data, country)
+
+    result = [
+        ('function', 'read_csv', lambda: (), lambda: (raw.clear(), read_raw())),
+    ]
+    for season in preprocessor.SEASONS:
+        # A warm load maps only the season's own cache file
+        result.append(('function', f'data_cache.load_preprocessed {season}', lambda: (),
+                       lambda season=season: data_cache.load_preprocessed(athlete_path, region_path, season)))
+    result += [
+        ('function', 'preprocessor.preprocess', read_raw, preprocessor.preprocess),
+        ('function', 'medal_cube.build', fresh, lambda data: medal_cube.MedalCube(data.backend().year_region_counts())),
+        ('function', 'helper.fetch_medal_tally', with_cube,
+         lambda cube, queries: [helper.fetch_medal_tally(cube, y, c) for y, c in queries]),
+        ('function', 'medal_cube.SortedTally', with_cube,
+         lambda cube, queries: [medal_cube.SortedTally(helper.fetch_medal_tally(cube, y, c)) for y, c in queries]),
+        ('function', 'medal_cube.SortedTally.page', with_tallies, tally_pages),
+        ('function', 'helper.data_over_time', fresh,
+         lambda data: [helper.data_over_time(data.df, col, 'count') for col in helper.OVER_TIME_COLUMNS]),
+    ]
+    for name, kind, figure in country_wise_analysis.COUNTRY_FIGURES:
+        result.append(('function', f'country_wise_analysis.{figure.__name__}', with_countries, render_figures(figure)))
+    for count in [1, 10]:
+        result.append(('function', f'country_wise_analysis.compare x{count}', *compare_figures(count)))
+    result += [
+        ('page', 'Medal Tally', *page(medal_tally_page)),
+        ('page', 'Overall Analysis', *page(overall_analysis.overall_analysis)),
+        ('page', 'Overall Analysis serial', *page(serial(overall_analysis.overall_analysis))),
+        ('page', 'Country-wise Analysis', *page(country_page)),
+        ('page', 'Athlete-wise Analysis', *page(athlete_wise_analysis.athlete_wise_analysis)),
+    ]
+    return result
+
+
+def measure(setup, run, repeat):
+    # Wall time of `repeat` runs, then one more run under tracemalloc for the
+    # peak of memory allocated while it ran
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - start)
+
+    args = setup()
+    tracemalloc.start()
+    try:
+        run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds_min': min(times), 'seconds_median': statistics.median(times),
+            'seconds': times, 'peak_mb': peak / 2 ** 20}
+
+
+def _versions():
+    versions = {'python': platform.python_version()}
+    for module in ['numpy', 'pandas', 'pyarrow', 'plotly', 'matplotlib', 'seaborn', 'streamlit', 'duckdb']:
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return versions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(scales, repeat, data_root, seed=0, only=None, page_workers=None):
+    import matplotlib
+    matplotlib.use('Agg')
+    import backends
+    import pipelines
+    if page_workers is not None:
+        pipelines.WORKERS = page_workers
+    import streamlit.config
+    import streamlit.logger
+
+    # Pages run headless: silence Streamlit's bare-mode warnings (its loggers,
+    # including ones created later, take its own level, which loading its
+    # config resets, so the config is loaded first) and library deprecation
+    # warnings
+    streamlit.config.get_config_options()
+    streamlit.logger.set_log_level(logging.ERROR)
+    warnings.filterwarnings('ignore')
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Keep the benchmark's preprocessed/backend caches apart from the app's
+        os.environ.setdefault('OLYMPIC_CACHE_DIR', os.path.join(tmp_dir, 'cache'))
+        import data_cache
+        data_cache.CACHE_DIR = os.environ['OLYMPIC_CACHE_DIR']
+
+        for scale in scales:
+            athlete_path, region_path = generate.generate(generate.dataset_dir(data_root, scale, seed), scale, seed)
+            data_cache.load_preprocessed(athlete_path, region_path)  # fills the Feather cache
+            with open(athlete_path) as f:
+                rows = sum(1 for _ in f) - 1
+            for group, name, setup, run in cases(athlete_path, region_path, tmp_dir):
+                if only and not any(word in name for word in only):
+                    continue
+                result = {'scale': scale, 'rows': rows, 'group': group, 'case': name, 'repeat': repeat,
+                          **measure(setup, run, repeat)}
+                print(f"x{scale:g} {group:8} {name:55} {result['seconds_median']:9.3f}s "
+                      f"{result['peak_mb']:9.1f} MB", flush=True)
+                results.append(result)
+
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': _git_commit(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'backend': backends.BACKEND,
+            'page_workers': pipelines.WORKERS,
+            'generator_version': generate.GENERATOR_VERSION,
+            'seed': seed,
+            'versions': _versions(),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold):
+    # Median time ratios (current / baseline) of the cases both files have;
+    # returns the cases slower than threshold
+    base = {(r['scale'], r['case']): r for r in baseline['results']}
+    regressions = []
+    print(f"{'case':62} {'baseline':>10} {'current':>10} {'ratio':>7} {'peak MB':>15}")
+    for r in current['results']:
+        b = base.get((r['scale'], r['case']))
+        if b is None:
+            continue
+        ratio = r['seconds_median'] / b['seconds_median'] if b['seconds_median'] else float('inf')
+        flag = '  <-- slower' if ratio > threshold else ''
+        print(f"x{r['scale']:<4g} {r['case']:56} {b['seconds_median']:9.3f}s {r['seconds_median']:9.3f}s "
+              f"{ratio:6.2f}x {b['peak_mb']:7.1f}/{r['peak_mb']:<7.1f}{flag}")
+        if ratio > threshold:
+            regressions.append(r['case'])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's computations on synthetic data")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0],
+                        help="dataset sizes relative to the real one, e.g. 1 10 100")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data', default=os.path.join('benchmarks', 'data'), help="where generated datasets are kept")
+    parser.add_argument('--only', nargs='+', help="run only cases whose name contains one of these words")
+    parser.add_argument('--page-workers', type=int,
+                        help="threads building a page's blocks (default OLYMPIC_PAGE_WORKERS)")
+    parser.add_argument('--out', help="results file (default benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="median time ratio above which a case counts as a regression")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.scales, args.repeat, args.data, args.seed, args.only, args.page_workers)
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['commit'] or 'nogit'}.json")
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
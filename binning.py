@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# Bin edges per attribute. A value v falls in bin i when edges[i-1] <= v < edges[i];
+# the first and last bins are open-ended. BMI is derived from Height and Weight.
+BIN_SPECS = {
+    'Age': {
+        'edges': [20, 25, 30, 35],
+        'labels': ['Under 20', '20–24', '25–29', '30–34', '35 and over'],
+    },
+    'Height': {
+        'edges': [160, 170, 180, 190],
+        'labels': ['Under 160cm', '160–169cm', '170–179cm', '180–189cm', '190cm and over'],
+    },
+    'Weight': {
+        # The upper edge sits just above 75 so that exactly 75kg stays middleweight
+        'edges': [60, np.nextafter(75, np.inf)],
+        'labels': ['Lightweight (<60kg)', 'Middleweight (60–75kg)', 'Heavyweight (>75kg)'],
+    },
+    'BMI': {
+        'edges': [18.5, 25, 30],
+        'labels': ['Underweight', 'Normal', 'Overweight', 'Obese'],
+    },
+}
+
+# Dimensions every count tensor is broken down by, after the bin itself
+DIMENSIONS = ['Sex', 'Medal', 'Sport']
+
+
+def bmi(df):
+    return df['Weight'].astype(float) / (df['Height'].astype(float) / 100) ** 2
+
+
+def assign_bins(values, spec):
+    # Bin position of every value, len(labels) for missing values
+    values = np.asarray(values, dtype=float)
+    codes = np.searchsorted(np.asarray(spec['edges'], dtype=float), values, side='right')
+    return np.where(np.isnan(values), len(spec['labels']), codes)
+
+
+class AttributeBins:
+    # Row counts by bin x Sex x Medal x Sport for every attribute in the specs,
+    # built once per dataset version from category codes. Each axis has a last
+    # slot for missing values. Breakdowns are sums over the tensor, not row scans.
+
+    def __init__(self, df, specs=BIN_SPECS):
+        self.specs = specs
+        self.categories = {dim: list(df[dim].cat.categories) for dim in DIMENSIONS}
+
+        dim_codes = []
+        for dim in DIMENSIONS:
+            codes = df[dim].cat.codes.to_numpy()
+            dim_codes.append(np.where(codes < 0, len(self.categories[dim]), codes))
+        dim_sizes = [len(self.categories[dim]) + 1 for dim in DIMENSIONS]
+
+        self.tensors = {}
+        for attr, spec in specs.items():
+            values = bmi(df) if attr == 'BMI' else df[attr]
+            shape = (len(spec['labels']) + 1, *dim_sizes)
+            flat = np.ravel_multi_index((assign_bins(values, spec), *dim_codes), shape)
+            self.tensors[attr] = np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+    def _axis_values(self, attr, axis):
+        return self.specs[attr]['labels'] if axis == 'bin' else self.categories[axis]
+
+    def counts(self, attr, by, **filters):
+        # Counts of attr's rows per value of `by` ('bin' or a dimension), over
+        # the rows matching the filters (e.g. Medal='Gold', Sex=['F', 'M']). A
+        # list filter keeps only those values, so it also drops missing ones.
+        # Missing values of `by` itself are left out.
+        tensor = self.tensors[attr]
+        axes = ['bin'] + DIMENSIONS
+        for axis, value in filters.items():
+            values = self._axis_values(attr, axis)
+            wanted = value if isinstance(value, (list, tuple)) else [value]
+            positions = [values.index(v) for v in wanted if v in values]
+            tensor = np.take(tensor, positions, axis=axes.index(axis))
+
+        keep = axes.index(by)
+        totals = tensor.sum(axis=tuple(i for i in range(len(axes)) if i != keep))
+        values = self._axis_values(attr, by)
+        return pd.Series(totals[:len(values)], index=values, name='Count')
@@ -1,35 +1,34 @@
+import pandas as pd
 import plotly.express as px
 import streamlit as st
 import seaborn as sns
 import matplotlib.pyplot as plt
+import figure_cache
 
-def country_wise_analysis(df,country):
-    temp_df=df.dropna(subset=['Medal'])
-    temp_df.drop_duplicates(subset=['Year','NOC','Games','Team','City','Sport','Event','Medal'],inplace=True)
-    new_df=temp_df[temp_df['region']==country]
-    final_df=new_df.groupby('Year').count()['Medal'].reset_index()
-    fig=px.line(final_df,x='Year',y='Medal')
-    st.header(f"{country} Medal Tally Over the Years")
-    st.plotly_chart(fig,use_container_width=True)
-    
-def country_sport_heatmap(df, country):
-    temp_df = df.dropna(subset=['Medal'])
-    temp_df.drop_duplicates(subset=['Year', 'NOC', 'Games', 'Team', 'City', 'Sport', 'Event', 'Medal'], inplace=True)
-    new_df = temp_df[temp_df['region'] == country]
+# The figures below only read from the store and return a figure, so they run
+# headless (precompute.py builds them for every region); the page functions
+# at the bottom put them on screen through the figure cache.
+
+def medals_over_time_figure(data, country):
+    final_df=data.backend().region_medals_by_year(country)
+    return px.line(final_df,x='Year',y='Medal')
+
+def sport_heatmap_figure(data, country):
+    medals = data.backend().region_sport_year_medals(country)
 
     # Pivot the data
-    pt = new_df.pivot_table(index='Sport', columns='Year', values='Medal', aggfunc='count').fillna(0)
+    pt = medals.pivot(index='Sport', columns='Year', values='Medal').fillna(0)
 
     # Create the figure
     fig, ax = plt.subplots(figsize=(20, 20))
     fig.patch.set_alpha(0)
     heatmap=sns.heatmap(pt, annot=True, fmt=".0f", cmap="magma", linewidths=0.5, ax=ax)
-    
+
     ax.tick_params(axis='x', rotation=45,colors='white')
     ax.tick_params(axis='y', rotation=0,colors='white')
     ax.set_xlabel('Year', fontsize=14, color='white')
     ax.set_ylabel('Sport', fontsize=14, color='white')
-    
+
     # Get the colorbar object
     colorbar = heatmap.collections[0].colorbar
 
@@ -37,53 +36,144 @@ def country_sport_heatmap(df, country):
     colorbar.ax.yaxis.set_tick_params(color='white')
     for label in colorbar.ax.get_yticklabels():
         label.set_color('white')  # You can change 'red' to any color
+    return fig
 
-    # Display in Streamlit
-    st.header(f"{country} Medal Tally in Different Sports")
-    st.pyplot(fig)
-
-def most_successful_athlete(df,country):
-    temp_df = df.dropna(subset=['Medal'])
-    new_df = temp_df[temp_df['region'] == country]
-    
-    # Group by athlete and count medals
-    most_successful = new_df.groupby('Name').count()['Medal'].reset_index()
-    most_successful = most_successful.sort_values(by='Medal', ascending=False).head(10)
+def most_successful_figure(data, country):
+    # The country's ten best athletes from the precomputed leaderboard
+    most_successful = data.leaderboards().top(10, region=country).rename(columns={'Total': 'Medal'})
+    # Plain strings so seaborn only draws the ten names instead of every category
+    most_successful['Name'] = most_successful['Name'].astype(str)
 
     # Create the figure
     fig, ax = plt.subplots(figsize=(20, 10))
     fig.patch.set_alpha(0)
     sns.barplot(data=most_successful, x='Medal', y='Name', palette='magma')
-    
+
     ax.set_xticklabels(ax.get_xticklabels(), fontsize=14, rotation=0, color='white')
     ax.set_yticklabels(ax.get_yticklabels(), fontsize=20, rotation=0, color='white')
     ax.set_xlabel('Number of Medals', fontsize=14, color='white')
     ax.set_ylabel('Athlete Name', fontsize=14, color='white')
-    
+    return fig
+
+def medal_split_figure(data, country):
+    # Medals won by the country's athletes, by type
+    split = data.backend().region_medal_split(country).set_axis(['Medal Type', 'Count'], axis=1)
+
+    # Plot pie chart
+    fig_pie = px.pie(split,
+                    names='Medal Type',
+                    values='Count',
+                    title=f'🏅 Medal Distribution for {country}',
+                    color='Medal Type',
+                    color_discrete_map=MEDAL_COLORS)
+
+    fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+    fig_pie.update_layout(title_x=0.5)
+    return fig_pie
+
+# Every figure of a country page: figure cache name, payload type, figure function
+COUNTRY_FIGURES = [
+    ('country_medals_over_time', 'plotly', medals_over_time_figure),
+    ('country_sport_heatmap', 'pyplot', sport_heatmap_figure),
+    ('most_successful_athletes', 'pyplot', most_successful_figure),
+    ('country_medal_split', 'plotly', medal_split_figure),
+]
+
+# The figures the page replaces with a warning for countries without medals
+# (there is nothing to put in the heatmap or the pie)
+MEDAL_FIGURES = {'country_sport_heatmap', 'country_medal_split'}
+
+# Comparison of several countries: each figure comes from one backend query
+# over all of them, so ten countries cost about as much as one
+
+MEDAL_COLORS = {'Gold': 'gold', 'Silver': 'silver', 'Bronze': '#cd7f32'}
+
+# Most countries one comparison shows: each selection is another set of
+# cached figures and another trace or heatmap row
+MAX_COMPARE = 10
+
+def compare_medals_over_time_figure(data, countries):
+    final_df = data.backend().regions_medals_by_year(countries)
+    return px.line(final_df, x='Year', y='Medal', color='region', markers=True,
+                   labels={'region': 'Country', 'Medal': 'Medals'})
+
+def compare_sport_heatmap_figure(data, countries):
+    medals = data.backend().regions_sport_year_medals(countries).astype({'region': str, 'Sport': str})
+    regions = sorted(medals['region'].unique())
+    sports = sorted(medals['Sport'].unique())
+    years = sorted(medals['Year'].unique())
+
+    # One Sport x Year grid per country, zero where it won nothing
+    grid = medals.set_index(['region', 'Sport', 'Year'])['Medal'].reindex(
+        pd.MultiIndex.from_product([regions, sports, years]), fill_value=0)
+    grids = grid.to_numpy().reshape(len(regions), len(sports), len(years))
+
+    columns = min(2, len(regions))
+    fig = px.imshow(grids, facet_col=0, facet_col_wrap=columns, x=years, y=sports, aspect='auto',
+                    color_continuous_scale='magma', labels={'x': 'Year', 'y': 'Sport', 'color': 'Medals'})
+    for annotation in fig.layout.annotations:
+        annotation.text = regions[int(annotation.text.split('=')[1])]
+    rows = -(-len(regions) // columns)
+    fig.update_layout(height=rows * max(400, 18 * len(sports)))
+    return fig
+
+def compare_medal_split_figure(data, countries):
+    split = data.backend().regions_medal_split(countries)
+    return px.bar(split, x='region', y='Count', color='Medal', color_discrete_map=MEDAL_COLORS,
+                  category_orders={'Medal': list(MEDAL_COLORS)},
+                  labels={'region': 'Country', 'Count': 'Medals', 'Medal': 'Medal Type'})
+
+def country_has_medals(data, country):
+    return not data.backend().region_medal_split(country).empty
+
+def country_wise_analysis(data,country):
+    st.header(f"{country} Medal Tally Over the Years")
+    figure_cache.plotly_chart(('country_medals_over_time', country, data.version),
+                              lambda: medals_over_time_figure(data, country), use_container_width=True)
+
+def country_sport_heatmap(data, country):
+    # Display in Streamlit
+    st.header(f"{country} Medal Tally in Different Sports")
+    if not country_has_medals(data, country):
+        st.warning(f"❌ No medal data found for **{country}**.")
+        return
+    figure_cache.pyplot(('country_sport_heatmap', country, data.version), lambda: sport_heatmap_figure(data, country))
+
+def most_successful_athlete(data,country):
     # Display in Streamlit
     st.header(f"Most Successful Athletes from {country}")
-    st.pyplot(fig)
-    
-    # Filter data for the selected country and drop missing medals
-    country_df = df[(df['region'] == country) & (df['Medal'].notna())]
+    figure_cache.pyplot(('most_successful_athletes', country, data.version), lambda: most_successful_figure(data, country))
 
     # Check if any medals exist for the selected country
-    if country_df.empty:
+    if not country_has_medals(data, country):
         st.warning(f"❌ No medal data found for **{country}**.")
     else:
-        # Count medal types
-        medal_counts = country_df['Medal'].value_counts().reset_index()
-        medal_counts.columns = ['Medal Type', 'Count']
-
-        # Plot pie chart
-        fig_pie = px.pie(medal_counts, 
-                        names='Medal Type', 
-                        values='Count', 
-                        title=f'🏅 Medal Distribution for {country}',
-                        color='Medal Type',
-                        color_discrete_map={'Gold':'gold', 'Silver':'silver', 'Bronze':'#cd7f32'})
-
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-        fig_pie.update_layout(title_x=0.5)
-
-        st.plotly_chart(fig_pie, use_container_width=True)
+        figure_cache.plotly_chart(('country_medal_split', country, data.version),
+                                  lambda: medal_split_figure(data, country), use_container_width=True)
+
+# Every figure of the comparison view, as in COUNTRY_FIGURES
+COMPARE_FIGURES = [
+    ('compare_medals_over_time', 'plotly', compare_medals_over_time_figure),
+    ('compare_medal_split', 'plotly', compare_medal_split_figure),
+    ('compare_sport_heatmap', 'plotly', compare_sport_heatmap_figure),
+]
+
+def compare_countries(data, countries):
+    if len(countries) > MAX_COMPARE:
+        raise ValueError(f"at most {MAX_COMPARE} countries can be compared, got {len(countries)}")
+    countries = tuple(sorted(countries))
+    if data.backend().regions_medal_split(countries).empty:
+        st.warning("❌ None of the selected countries won a medal.")
+        return
+
+    st.header("Medals Over the Years")
+    figure_cache.plotly_chart(('compare_medals_over_time', countries, data.version),
+                              lambda: compare_medals_over_time_figure(data, countries), use_container_width=True)
+
+    st.header("Medal Type Split")
+    figure_cache.plotly_chart(('compare_medal_split', countries, data.version),
+                              lambda: compare_medal_split_figure(data, countries), use_container_width=True)
+
+    st.header("Medals in Different Sports")
+    figure_cache.plotly_chart(('compare_sport_heatmap', countries, data.version),
+                              lambda: compare_sport_heatmap_figure(data, countries), use_container_width=True)
@@ -0,0 +1,104 @@
+import hashlib
+import os
+
+import pandas as pd
+import preprocessor
+import profiling
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional, without it we simply preprocess every time
+    feather = None
+
+CACHE_DIR = os.environ.get("OLYMPIC_CACHE_DIR", ".olympic_cache")
+
+# (path, size, mtime) -> digest, so a warm process never re-reads the CSV bytes
+_digests = {}
+
+
+def file_digest(path):
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _digests:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _digests[memo_key] = h.hexdigest()
+    return _digests[memo_key]
+
+
+def cache_key(athlete_path, region_path, season=preprocessor.DEFAULT_SEASON):
+    # Any change to either CSV or to the preprocessing code gives a new key;
+    # every season of the same CSVs has its own
+    h = hashlib.blake2b(digest_size=16)
+    h.update(file_digest(athlete_path).encode())
+    h.update(file_digest(region_path).encode())
+    h.update(str(preprocessor.PREPROCESS_VERSION).encode())
+    h.update(season.encode())
+    return h.hexdigest()
+
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"preprocessed-{key}.feather")
+
+
+def prune(keep, prefix="preprocessed-"):
+    # Remove the cache files of other versions; keep is a path or a set of paths
+    keep = {os.path.basename(p) for p in ([keep] if isinstance(keep, str) else keep)}
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith(prefix) and name not in keep:
+            try:
+                os.remove(os.path.join(CACHE_DIR, name))
+            except OSError:
+                pass
+
+
+def read_cached(key):
+    path = _cache_path(key)
+    if feather is None or not os.path.exists(path):
+        return None
+    # Uncompressed Arrow IPC + memory_map lets numeric columns be used without a copy
+    table = feather.read_table(path, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def write_cached(frames):
+    # frames maps cache keys to preprocessed frames (one per season), written
+    # together so that no version is ever left with some seasons missing
+    if feather is None:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    paths = set()
+    for key, df in frames.items():
+        path = _cache_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(df, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        paths.add(path)
+    prune(paths)
+
+
+def load_preprocessed(athlete_path="athlete_events.csv", region_path="noc_regions.csv",
+                      season=preprocessor.DEFAULT_SEASON):
+    # The preprocessed rows of one season. Seasons are cached in files of their
+    # own, so a warm load maps only that season's file and never touches the
+    # other seasons' rows.
+    if season not in preprocessor.SEASONS:
+        raise ValueError(f"Unknown season {season!r}, expected one of {preprocessor.SEASONS}")
+    key = cache_key(athlete_path, region_path, season)
+    with profiling.section('read_cached', 'load'):
+        df = read_cached(key)
+    if df is not None:
+        return df
+
+    # Cold: the CSV is parsed once and every season's file written from it
+    with profiling.section('read_csv', 'load'):
+        df = pd.read_csv(athlete_path)
+        region_df = pd.read_csv(region_path)
+    with profiling.section('preprocess', 'load'):
+        seasons = preprocessor.preprocess_seasons(df, region_df)
+
+    with profiling.section('write_cached', 'load'):
+        write_cached({cache_key(athlete_path, region_path, s): seasons[s] for s in preprocessor.SEASONS})
+    return seasons[season]
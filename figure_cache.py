@@ -0,0 +1,211 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+import data_cache
+import profiling
+
+# Upper bound on the serialized figures kept in memory, per process
+MAX_BYTES = int(os.environ.get("OLYMPIC_FIGURE_CACHE_MB", "256")) * 1024 * 1024
+
+# Directory of the disk tier, shared by every process (the batch precompute writes here too)
+DISK_DIR = os.environ.get("OLYMPIC_FIGURE_DIR", os.path.join(data_cache.CACHE_DIR, "figures"))
+
+# Upper bound on the disk tier; past it the least recently used figures are
+# removed until it is back under three quarters of the budget
+MAX_DISK_BYTES = int(os.environ.get("OLYMPIC_FIGURE_DISK_MB", "1024")) * 1024 * 1024
+
+# File suffix of each payload type on disk
+_SUFFIXES = {str: '.json', bytes: '.png'}
+
+
+class FigureCache:
+    # Size-bounded LRU of rendered figures (Plotly JSON strings or matplotlib
+    # PNG bytes) keyed by (view, parameters, dataset version), in front of a
+    # size-bounded directory of the same payloads that outlives the process.
+    # A file's mtime is its last use, so figures of older dataset versions age
+    # out of the disk tier once they are no longer read.
+
+    def __init__(self, max_bytes=MAX_BYTES, disk_dir=DISK_DIR, max_disk_bytes=MAX_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # Estimated size of the disk tier, None until the directory is first
+        # scanned; other processes write there too, so every trim rescans it
+        self._disk_size = None
+        self._disk_lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+        payload = self._read_disk(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, payload)
+        return payload
+
+    def put(self, key, payload):
+        self._remember(key, payload)
+        self._write_disk(key, payload)
+
+    def _remember(self, key, payload):
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = payload
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _disk_path(self, key, suffix):
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.disk_dir, name + suffix)
+
+    def _read_disk(self, key):
+        for kind, suffix in _SUFFIXES.items():
+            path = self._disk_path(key, suffix)
+            try:
+                with open(path, 'rb') as f:
+                    payload = f.read()
+                os.utime(path)  # mark it recently used
+            except OSError:
+                continue
+            return payload.decode() if kind is str else payload
+        return None
+
+    def _write_disk(self, key, payload):
+        # Written to a temporary file and renamed, so readers in other
+        # processes never see a partial figure
+        if len(payload) > self.max_disk_bytes:
+            return
+        path = self._disk_path(key, _SUFFIXES[type(payload)])
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(payload.encode() if isinstance(payload, str) else payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            return  # the disk tier is best effort, the figure is still served from memory
+        with self._disk_lock:
+            if self._disk_size is not None:
+                self._disk_size += len(payload)
+            if self._disk_size is None or self._disk_size > self.max_disk_bytes:
+                self._disk_size = self._trim_disk(self.max_disk_bytes * 3 // 4)
+
+    def _trim_disk(self, target):
+        # Remove the least recently used figures until the directory holds at
+        # most target bytes (only when it is over budget); returns its size
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith('.tmp'):
+                continue  # another writer's figure in progress
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        size = sum(file_size for _, file_size, _ in files)
+        if size <= self.max_disk_bytes:
+            return size
+        for _, file_size, path in sorted(files):
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # already removed by another process
+            size -= file_size
+        return size
+
+    def prune_disk(self, older_than):
+        # Remove disk entries last used before the given time.time()
+        if not os.path.isdir(self.disk_dir):
+            return 0
+        removed = 0
+        for name in os.listdir(self.disk_dir):
+            path = os.path.join(self.disk_dir, name)
+            try:
+                if os.path.getmtime(path) < older_than:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'bytes': self._size, 'max_bytes': self.max_bytes}
+
+
+# One cache per process, shared by every session
+cache = FigureCache()
+
+
+def plotly_payload(cache_key, build):
+    # The Plotly JSON for cache_key, from the cache or from build() on a miss
+    payload = cache.get(cache_key)
+    if payload is None:
+        with profiling.section(f'figure:{cache_key[0]}', 'figure'):
+            payload = build().to_json()
+        cache.put(cache_key, payload)
+    return payload
+
+
+def pyplot_payload(cache_key, build):
+    # The PNG for cache_key, from the cache or from build() on a miss; build()
+    # returns a matplotlib figure, saved as the same PNG st.pyplot would produce
+    png = cache.get(cache_key)
+    if png is None:
+        import matplotlib.pyplot as plt
+        with profiling.section(f'figure:{cache_key[0]}', 'figure'):
+            fig = build()
+            image = io.BytesIO()
+            fig.savefig(image, bbox_inches="tight", dpi=200, format="png")
+            plt.close(fig)
+            png = image.getvalue()
+        cache.put(cache_key, png)
+    return png
+
+
+def show_plotly(container, payload, **kwargs):
+    # container is st or a placeholder; kwargs go to plotly_chart
+    import plotly.io as pio
+    container.plotly_chart(pio.from_json(payload), **kwargs)
+
+
+def show_png(container, png):
+    container.image(png, use_container_width=True)
+
+
+def plotly_chart(cache_key, build, **kwargs):
+    # build() is only called on a miss and returns a Plotly figure; kwargs go to st.plotly_chart
+    show_plotly(st, plotly_payload(cache_key, build), **kwargs)
+
+
+def pyplot(cache_key, build):
+    show_png(st, pyplot_payload(cache_key, build))
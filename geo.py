@@ -0,0 +1,129 @@
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# IOC codes (current and historic) that are not the ISO 3166 alpha-3 code of
+# the country. Every other NOC in noc_regions.csv is already its ISO-3 code.
+# Codes shared by several regions (the United Arab Republic, UAR, was listed
+# under both Egypt and Syria) stay unmapped so they cannot win a region.
+IOC_TO_ISO3 = {
+    'AHO': 'CUW', 'ALG': 'DZA', 'ANG': 'AGO', 'ANT': 'ATG', 'ANZ': 'AUS', 'ARU': 'ABW',
+    'ASA': 'ASM', 'BAH': 'BHS', 'BAN': 'BGD', 'BAR': 'BRB', 'BER': 'BMU', 'BHU': 'BTN',
+    'BIR': 'MMR', 'BIZ': 'BLZ', 'BOH': 'CZE', 'BOT': 'BWA', 'BRN': 'BHR', 'BRU': 'BRN', 'BUL': 'BGR',
+    'BUR': 'BFA', 'CAM': 'KHM', 'CAY': 'CYM', 'CEY': 'LKA', 'CGO': 'COG', 'CHA': 'TCD',
+    'CHI': 'CHL', 'CRC': 'CRI', 'CRO': 'HRV', 'CRT': 'GRC', 'DAH': 'BEN', 'DEN': 'DNK',
+    'ESA': 'SLV', 'EUN': 'RUS', 'FIJ': 'FJI', 'FRG': 'DEU', 'GAM': 'GMB', 'GBS': 'GNB',
+    'GDR': 'DEU', 'GEQ': 'GNQ', 'GER': 'DEU', 'GRE': 'GRC', 'GRN': 'GRD', 'GUA': 'GTM',
+    'GUI': 'GIN', 'HAI': 'HTI', 'HBR': 'BLZ', 'HON': 'HND', 'INA': 'IDN', 'IRI': 'IRN',
+    'ISV': 'VIR', 'IVB': 'VGB', 'KSA': 'SAU', 'KUW': 'KWT', 'LAT': 'LVA', 'LBA': 'LBY',
+    'LES': 'LSO', 'LIB': 'LBN', 'MAD': 'MDG', 'MAL': 'MYS', 'MAS': 'MYS', 'MAW': 'MWI',
+    'MGL': 'MNG', 'MON': 'MCO', 'MRI': 'MUS', 'MTN': 'MRT', 'MYA': 'MMR', 'NBO': 'MYS',
+    'NCA': 'NIC', 'NED': 'NLD', 'NEP': 'NPL', 'NGR': 'NGA', 'NIG': 'NER', 'OMA': 'OMN',
+    'PAR': 'PRY', 'PHI': 'PHL', 'PLE': 'PSE', 'POR': 'PRT', 'PUR': 'PRI', 'RHO': 'ZWE',
+    'RSA': 'ZAF', 'RU1': 'RUS', 'SAA': 'DEU', 'SAM': 'WSM', 'SCG': 'SRB', 'SEY': 'SYC',
+    'SIN': 'SGP', 'SKN': 'KNA', 'SLO': 'SVN', 'SOL': 'SLB', 'SRI': 'LKA', 'SUD': 'SDN',
+    'SUI': 'CHE', 'TAN': 'TZA', 'TCH': 'CZE', 'TGA': 'TON', 'TOG': 'TGO', 'TPE': 'TWN',
+    'TRI': 'TTO', 'UAE': 'ARE', 'URS': 'RUS', 'URU': 'URY', 'VAN': 'VUT',
+    'VIE': 'VNM', 'VIN': 'VCT', 'VOL': 'BFA', 'YAR': 'YEM', 'YMD': 'YEM', 'YUG': 'SRB',
+    'ZAI': 'COD', 'ZAM': 'ZMB', 'ZIM': 'ZWE',
+}
+
+# NOCs that are not a country (refugee and independent teams, unknown)
+NON_COUNTRY_NOCS = {'IOA', 'ROT', 'UNK'}
+
+
+def region_iso3(region_df):
+    # region -> ISO-3 from the NOC/region pairs of noc_regions.csv. A region with
+    # several NOCs (e.g. Germany: GER, FRG, GDR, SAA) takes its most common code.
+    pairs = region_df[['NOC', 'region']].dropna().astype(str).drop_duplicates()
+    pairs = pairs[~pairs['NOC'].isin(NON_COUNTRY_NOCS)]
+    pairs['iso3'] = pairs['NOC'].map(IOC_TO_ISO3).fillna(pairs['NOC'])
+    counts = pairs.groupby(['region', 'iso3']).size().reset_index(name='n')
+    counts = counts.sort_values(['region', 'n', 'iso3'], ascending=[True, False, True])
+    iso3 = counts.drop_duplicates('region').set_index('region')['iso3']
+
+    # Two regions on one code would be summed into one map location under one name
+    shared = iso3[iso3.duplicated(keep=False)]
+    if not shared.empty:
+        raise ValueError(f"Regions share ISO-3 codes: {shared.sort_values().to_dict()}")
+    return iso3
+
+
+def _year_matrix(table, iso3, value, facet=None):
+    # Years x locations (x facet) matrix of values, NaN where a region is absent
+    table = table.astype({'region': str})
+    table = table.assign(iso3=table['region'].map(iso3)).dropna(subset=['iso3'])
+    columns = ['iso3'] if facet is None else [facet, 'iso3']
+    matrix = table.pivot_table(index='Year', columns=columns, values=value, aggfunc='sum', observed=True)
+    names = table.drop_duplicates('iso3').set_index('iso3')['region']
+    return matrix, names
+
+
+def _trace(locations, z, names, **kwargs):
+    return go.Choropleth(locations=locations, z=z, text=names, locationmode='ISO-3',
+                         coloraxis='coloraxis', hovertemplate='%{text}: %{z}<extra></extra>', **kwargs)
+
+
+def _z(values):
+    # Compact payload: integers, and null where a region did not take part
+    return [None if np.isnan(v) else int(v) for v in values]
+
+
+def _animate(fig, frames, years, traces):
+    fig.frames = [go.Frame(name=str(year), data=data, traces=traces) for year, data in zip(years, frames)]
+    steps = [dict(method='animate', label=str(year),
+                  args=[[str(year)], dict(mode='immediate', frame=dict(duration=300, redraw=True))])
+             for year in years]
+    fig.update_layout(
+        sliders=[dict(steps=steps, currentvalue=dict(prefix='Year='))],
+        updatemenus=[dict(type='buttons', showactive=False, buttons=[
+            dict(label='▶', method='animate', args=[None, dict(frame=dict(duration=500, redraw=True), fromcurrent=True)]),
+            dict(label='◼', method='animate', args=[[None], dict(mode='immediate', frame=dict(duration=0, redraw=False))]),
+        ])],
+    )
+
+
+def medal_choropleth(country_medals, iso3, title, year=None):
+    # Medals by region over the years. Every frame shares one trace with fixed
+    # locations and names and only carries its z values; with a year given only
+    # that edition is built, so nothing else is sent to the browser.
+    matrix, names = _year_matrix(country_medals, iso3, 'Medal')
+    locations = list(matrix.columns)
+    labels = names[locations].tolist()
+    zmax = float(np.nanmax(matrix.to_numpy())) if matrix.size else 1
+
+    years = list(matrix.index) if year is None else [year]
+    rows = [matrix.loc[y].to_numpy() if y in matrix.index else np.full(len(locations), np.nan) for y in years]
+
+    fig = go.Figure(_trace(locations, _z(rows[0]), labels))
+    fig.update_layout(title=title, coloraxis=dict(colorscale=px.colors.sequential.Plasma, cmin=0, cmax=zmax,
+                                                  colorbar=dict(title='Medal')))
+    if year is None:
+        _animate(fig, [[go.Choropleth(z=_z(row))] for row in rows], years, [0])
+    return fig
+
+
+def gender_choropleth(gender_map_data, iso3, title, year=None):
+    # Participation by region, one map per sex; frames carry only both z arrays
+    matrix, names = _year_matrix(gender_map_data, iso3, 'Count', facet='Sex')
+    sexes = list(matrix.columns.get_level_values('Sex').unique())
+    zmax = float(np.nanmax(matrix.to_numpy())) if matrix.size else 1
+
+    fig = make_subplots(rows=1, cols=len(sexes), specs=[[{'type': 'choropleth'}] * len(sexes)],
+                        subplot_titles=[f'Sex={sex}' for sex in sexes])
+    years = list(matrix.index) if year is None else [year]
+    frames = [[] for _ in years]
+    for col, sex in enumerate(sexes, start=1):
+        part = matrix[sex]
+        locations = list(part.columns)
+        rows = [part.loc[y].to_numpy() if y in part.index else np.full(len(locations), np.nan) for y in years]
+        fig.add_trace(_trace(locations, _z(rows[0]), names[locations].tolist()), row=1, col=col)
+        for frame, row in zip(frames, rows):
+            frame.append(go.Choropleth(z=_z(row)))
+
+    fig.update_layout(title=title, coloraxis=dict(colorscale=px.colors.sequential.Plasma, cmin=0, cmax=zmax,
+                                                  colorbar=dict(title='Count')))
+    if year is None:
+        _animate(fig, frames, years, list(range(len(sexes))))
+    return fig
@@ -1,12 +1,15 @@
-import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import streamlit as st
 
-def medal_tally(df):
-    medal_tally=df.drop_duplicates(subset=['Team','NOC','Medal','Games','Year','City','Sport','Event'])
-    medal_tally=medal_tally.groupby('region').sum()[['Gold','Silver','Bronze']].sort_values('Gold',ascending=False).reset_index()
+# Columns whose distinct values per year the Overall page plots
+OVER_TIME_COLUMNS = ['region', 'Event', 'Sport', 'ID']
+
+def sum_medals(df, by):
+    # The medal flags are int8, so widen them before summing or large tallies overflow
+    keys = [df[col] for col in by] if isinstance(by, list) else df[by]
+    return df[['Gold', 'Silver', 'Bronze']].astype(int).groupby(keys, observed=True).sum()
+
+def medal_tally(medal_df):
+    medal_tally=sum_medals(medal_df,'region').sort_values('Gold',ascending=False).reset_index()
     medal_tally['Total'] = medal_tally['Gold'] + medal_tally['Silver'] + medal_tally['Bronze']
     
     medal_tally['Gold']=medal_tally['Gold'].astype('int')
@@ -21,86 +24,82 @@ def country_year_list(df):
     years.sort()
     years.insert(0,'Overall')
     
-    country=np.unique(df['region'].dropna().values).tolist()
+    country=df['region'].dropna().unique().tolist()
     country.sort()
     country.insert(0,'Overall')
     
     return country,years
 
-def fetch_medal_tally(df, year, country):
-    # Drop duplicate medals to count only unique wins
-    medal_df = df.drop_duplicates(subset=['Team', 'NOC', 'Medal', 'Games', 'Year', 'City', 'Sport', 'Event'])
-    
-    flag = 0
-    temp_df = medal_df  # ✅ Set default value to avoid UnboundLocalError
-
+def fetch_medal_tally(cube, year, country):
+    # cube is the store's precomputed MedalCube (DataStore.medal_cube()), so
+    # every branch is a lookup of an already grouped, sorted and totalled table
     if year == "Overall" and country == "Overall":
-        temp_df = medal_df  # ✅ Already set, but kept for clarity
+        x = cube.overall
     
     elif year == "Overall" and country != "Overall":
-        flag = 1
-        temp_df = medal_df[medal_df['region'] == country]
+        x = cube.by_region.get(country)
     
     elif year != "Overall" and country == "Overall":
-        temp_df = medal_df[medal_df['Year'] == year]
+        x = cube.by_year.get(year)
     
-    elif year != "Overall" and country != "Overall":  # ✅ Fixed condition
-        temp_df = medal_df[(medal_df['Year'] == year) & (medal_df['region'] == country)]
-
-    # Group data based on the flag condition
-    if temp_df.empty:
-        return pd.DataFrame(columns=['Gold', 'Silver', 'Bronze', 'Total'])  # ✅ Return empty DataFrame if no data
-    
-    if flag == 1:
-        x = temp_df.groupby('Year').sum()[['Gold', 'Bronze', 'Silver']].sort_values('Year').reset_index()
     else:
-        x = temp_df.groupby('region').sum()[['Gold', 'Bronze', 'Silver']].sort_values('Gold', ascending=False).reset_index()
-
-    # Add total medals column
-    x['Total'] = x['Gold'] + x['Silver'] + x['Bronze']
+        x = cube.year_region(year, country)
 
-    # Convert to integers for cleaner display
-    for col in ['Gold', 'Silver', 'Bronze', 'Total']:
-        x[col] = x[col].astype(int)
+    if x is None or x.empty:
+        return pd.DataFrame(columns=['Gold', 'Silver', 'Bronze', 'Total'])  # ✅ Return empty DataFrame if no data
 
-    return x
+    return x.copy(deep=False)
 
 def data_over_time(df,col,y_label):
-    nation_over_time=df.drop_duplicates(['Year',col])['Year'].value_counts().reset_index().sort_values('Year')
-    nation_over_time.rename(columns={'count':y_label,'Year':'Edition'},inplace=True)
+    # Distinct values of col in each edition (a missing value counts as one)
+    nation_over_time=df.groupby('Year')[col].nunique(dropna=False).reset_index()
+    nation_over_time.rename(columns={col:y_label,'Year':'Edition'},inplace=True)
     return nation_over_time
 
-def height_weight_analysis(df, sport):
-    # Drop duplicates to get unique athletes
-    athlete_df = df.drop_duplicates(subset=['Name', 'region'])
-    
-    # Fill missing medal values
-    athlete_df['Medal'].fillna('No Medal', inplace=True)
-    
-    # Filter by selected sport
-    temp_df = athlete_df[athlete_df['Sport'] == sport]
-    
-    # Create figure
-    # Create figure with custom background
-    fig = plt.figure(figsize=(12, 8), facecolor='#1e1e1e')  # dark gray background
-
-    # Plot
-    ax = sns.scatterplot(data=temp_df, x='Weight', y='Height', hue='Medal', palette='Set2', alpha=0.7)
-
-    # Update axes background color
-    ax.set_facecolor('#2a2a2a')  # slightly lighter gray
-    ax.figure.set_facecolor('#1e1e1e')  # match the figure background
-
-    # Update label colors
-    ax.set_title(f"Height vs Weight of Athletes in {sport}", fontsize=16, color='white')
-    ax.set_xlabel("Weight (kg)", color='white')
-    ax.set_ylabel("Height (cm)", color='white')
-    ax.tick_params(colors='white')  # tick color
-    ax.legend(title='Medal', facecolor='#2a2a2a', edgecolor='white', labelcolor='white', title_fontsize='13', fontsize='11')
-
-    # Grid
-    ax.grid(True, color='gray', alpha=0.3)
+def height_weight_analysis(data, sport):
+    # Imported on first use so that pages without this chart never load matplotlib or seaborn
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import figure_cache
+    import scatter_lod
+
+    def build():
+        # Unique athletes of the selected sport, looked up through the store's index
+        temp_df = data.select('athletes', Sport=sport)
+        
+        # Fill missing medal values ('No Medal' has to be a category before it can be used)
+        temp_df['Medal'] = temp_df['Medal'].cat.add_categories('No Medal').fillna('No Medal')
+        palette = dict(zip(temp_df['Medal'].cat.categories, sns.color_palette('Set2')))
+        
+        # Create figure with custom background
+        fig = plt.figure(figsize=(12, 8), facecolor='#1e1e1e')  # dark gray background
+
+        # Plot: every athlete for small sports, the sport's cached 2-D bins for large ones
+        points = temp_df[['Weight', 'Height']].notna().all(axis=1).sum()
+        if points > scatter_lod.LOD_POINTS:
+            ax = fig.gca()
+            handles = data.height_weight_grid(sport).draw(ax, palette)
+            title = f"Height vs Weight of Athletes in {sport} ({points:,} athletes, binned)"
+        else:
+            ax = sns.scatterplot(data=temp_df, x='Weight', y='Height', hue='Medal', palette=palette, alpha=0.7)
+            handles = None
+            title = f"Height vs Weight of Athletes in {sport}"
+
+        # Update axes background color
+        ax.set_facecolor('#2a2a2a')  # slightly lighter gray
+        ax.figure.set_facecolor('#1e1e1e')  # match the figure background
+
+        # Update label colors
+        ax.set_title(title, fontsize=16, color='white')
+        ax.set_xlabel("Weight (kg)", color='white')
+        ax.set_ylabel("Height (cm)", color='white')
+        ax.tick_params(colors='white')  # tick color
+        ax.legend(handles=handles, title='Medal', facecolor='#2a2a2a', edgecolor='white', labelcolor='white', title_fontsize='13', fontsize='11')
+
+        # Grid
+        ax.grid(True, color='gray', alpha=0.3)
+        return fig
 
     # Show in Streamlit
-    st.pyplot(fig)
+    figure_cache.pyplot(('height_weight', sport, data.version), build)
 
@@ -0,0 +1,85 @@
+import hashlib
+
+import pandas as pd
+
+import helper
+import preprocessor
+
+
+def prepare_edition(new_rows, region_df, known_years, start, season=preprocessor.DEFAULT_SEASON):
+    # Preprocess only the new edition's raw rows of the store's season. Editions
+    # are whole years, so they cannot duplicate anything already stored and
+    # only need deduping among themselves.
+    new_df = preprocessor.preprocess(new_rows, region_df, season)
+    overlap = sorted(set(new_df['Year'].unique().tolist()) & set(known_years))
+    if overlap:
+        raise ValueError(f"Years {overlap} are already in the dataset, rebuild from the CSVs instead")
+    new_df.index = new_df.index + start
+    return new_df
+
+
+def edition_digest(new_rows):
+    hashes = pd.util.hash_pandas_object(new_rows, index=False).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=8).hexdigest()
+
+
+def concat_aligned(old, new):
+    # pd.concat turns categoricals with different category lists into objects,
+    # so both sides first get the sorted union a full rebuild would produce.
+    # Columns with a fixed category list (Medal) keep theirs.
+    old = old.copy(deep=False)
+    new = new.reindex(columns=old.columns)
+    for col in old.columns:
+        if isinstance(old[col].dtype, pd.CategoricalDtype):
+            values = pd.Index(new[col].dropna().unique())
+            if not values.isin(old[col].cat.categories).all():
+                old[col] = old[col].cat.set_categories(old[col].cat.categories.union(values))
+            new[col] = new[col].astype(old[col].dtype)
+    return pd.concat([old, new])
+
+
+def extend_country_year_list(country_year, new_df):
+    country, years = country_year
+    new_country, new_years = helper.country_year_list(new_df)
+    country = ['Overall'] + sorted(set(country[1:]) | set(new_country[1:]))
+    years = ['Overall'] + sorted(years[1:] + new_years[1:])
+    return country, years
+
+
+def extend_over_time(counts, new_df, col):
+    new_counts = helper.data_over_time(new_df, col, 'count')
+    return pd.concat([counts, new_counts]).sort_values('Edition', kind='stable')
+
+
+def _normalized(df):
+    df = df.reset_index(drop=True)
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def assert_same_frame(a, b, check_dtype=False):
+    # Categoricals compare as their values; dtypes are only compared when asked
+    pd.testing.assert_frame_equal(_normalized(a), _normalized(b), check_dtype=check_dtype)
+
+
+def _sorted_rows(df):
+    # The rows in an order of their own: the real CSV lists each athlete's
+    # rows together, so a rebuild interleaves the new edition with the old ones
+    df = _normalized(df)
+    return df.sort_values(list(df.columns), kind='stable')
+
+
+def assert_same_tables(appended, rebuilt):
+    # Everything the incremental path maintains must match a from-scratch build
+    assert_same_frame(_sorted_rows(appended.df), _sorted_rows(rebuilt.df))
+    assert_same_frame(_sorted_rows(appended.medal_events()), _sorted_rows(rebuilt.medal_events()))
+    assert appended.country_year_list() == rebuilt.country_year_list()
+    for col in helper.OVER_TIME_COLUMNS:
+        assert_same_frame(appended.data_over_time(col, col), rebuilt.data_over_time(col, col))
+
+    a, b = appended.medal_cube(), rebuilt.medal_cube()
+    assert_same_frame(a.overall, b.overall)
+    assert a.by_year.keys() == b.by_year.keys() and a.by_region.keys() == b.by_region.keys()
+    for year in b.by_year:
+        assert_same_frame(a.by_year[year], b.by_year[year])
+    for region in b.by_region:
+        assert_same_frame(a.by_region[region], b.by_region[region])
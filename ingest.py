@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+
+import helper
+import medal_cube
+import preprocessor
+
+# Key of the second, independent row hash that checks the first for collisions
+_CHECK_KEY = 'ingest-row-check'
+
+
+class _SeenRows:
+    # Two independent 64-bit hashes of every row already kept, so duplicates
+    # are dropped across chunk boundaries without holding the rows themselves.
+    # The set grows by 16 bytes per distinct row (about 4 MB for the full
+    # athlete_events.csv), not with the chunk size. Rows whose first hashes
+    # match but whose second hashes differ are a hash collision: the ingest
+    # stops rather than drop a row that is not a duplicate.
+
+    def __init__(self):
+        # Sorted by hash, with the check hash of each kept row alongside
+        self._hashes = np.array([], dtype=np.uint64)
+        self._checks = np.array([], dtype=np.uint64)
+
+    def first_seen(self, df, columns=None):
+        rows = df if columns is None else df[columns]
+        hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+        checks = pd.util.hash_pandas_object(rows, index=False, hash_key=_CHECK_KEY).to_numpy()
+
+        # Within the chunk
+        pairs = pd.DataFrame({'hash': hashes, 'check': checks})
+        first = ~pairs.duplicated().to_numpy()
+        collided = pairs['hash'][first].duplicated().any()
+
+        # Against the rows kept from earlier chunks
+        positions = np.minimum(np.searchsorted(self._hashes, hashes), max(len(self._hashes) - 1, 0))
+        seen = np.zeros(len(hashes), dtype=bool)
+        if len(self._hashes):
+            seen = self._hashes[positions] == hashes
+            collided |= (seen & (self._checks[positions] != checks)).any()
+        if collided:
+            raise ValueError("64-bit row hash collision while dropping duplicate rows")
+
+        # Merge the new hashes into the sorted arrays rather than re-sorting them
+        keep = first & ~seen
+        order = np.argsort(hashes[keep])
+        new_hashes, new_checks = hashes[keep][order], checks[keep][order]
+        at = np.searchsorted(self._hashes, new_hashes)
+        self._hashes = np.insert(self._hashes, at, new_hashes)
+        self._checks = np.insert(self._checks, at, new_checks)
+        return keep
+
+
+class StreamingAggregates:
+    # Running totals the dashboards need, updated one chunk at a time
+
+    def __init__(self):
+        self._medal_events = _SeenRows()
+        self.cube = None
+        self.pairs = {col: None for col in helper.OVER_TIME_COLUMNS}
+
+    def update(self, chunk):
+        # Medal cube over this chunk's share of the medal-event table
+        events = chunk[self._medal_events.first_seen(chunk, preprocessor.MEDAL_EVENT_KEY)]
+        counts = helper.sum_medals(events, ['Year', 'region'])
+        self.cube = counts if self.cube is None else self.cube.add(counts, fill_value=0).astype(int)
+
+        # Distinct (Year, value) pairs; their number is far below the row count
+        for col in helper.OVER_TIME_COLUMNS:
+            pairs = chunk[['Year', col]].astype({col: object}).drop_duplicates()
+            if self.pairs[col] is not None:
+                pairs = pd.concat([self.pairs[col], pairs]).drop_duplicates()
+            self.pairs[col] = pairs
+
+    def medal_cube(self):
+        cube = self.cube.sort_index()
+        cube['Total'] = cube['Gold'] + cube['Silver'] + cube['Bronze']
+        return medal_cube.MedalCube(cube[medal_cube.TALLY_COLUMNS])
+
+    def country_year_list(self):
+        # Same lists as helper.country_year_list on the full frame
+        years = sorted(int(y) for y in self.pairs['region']['Year'].unique())
+        regions = sorted(self.pairs['region']['region'].dropna().unique().tolist())
+        return ['Overall'] + regions, ['Overall'] + years
+
+    def over_time(self, col, y_label):
+        # Same table as helper.data_over_time on the full frame
+        counts = self.pairs[col]['Year'].astype(int).value_counts().rename_axis('Year').reset_index()
+        return counts.sort_values('Year').rename(columns={'count': y_label, 'Year': 'Edition'})
+
+    def save(self, out_dir):
+        agg_dir = os.path.join(out_dir, 'aggregates')
+        os.makedirs(agg_dir, exist_ok=True)
+        feather.write_feather(self.cube.reset_index(), os.path.join(agg_dir, 'medal_cube.feather'))
+        for col, pairs in self.pairs.items():
+            feather.write_feather(pairs.reset_index(drop=True), os.path.join(agg_dir, f'pairs_{col}.feather'))
+
+
+def _partition_table(chunk):
+    # A categorical column that is missing in every row of the chunk (notes,
+    # often) has no values to type its categories: Arrow makes them null, and
+    # the partitions would no longer share one schema. They are strings.
+    table = pa.Table.from_pandas(chunk, preserve_index=True)
+    schema = table.schema
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type) and pa.types.is_null(field.type.value_type):
+            schema = schema.set(i, field.with_type(pa.dictionary(field.type.index_type, pa.string())))
+    return table.cast(schema)
+
+
+def ingest_csv(athlete_path, region_path, out_dir, chunksize=100_000, season=preprocessor.DEFAULT_SEASON):
+    # Streaming equivalent of preprocessor.preprocess: the CSV is read chunksize
+    # rows at a time and each processed chunk is written as its own partition,
+    # so the rows held at once follow the chunk size rather than the file
+    # size. What outlives a chunk grows with the data: the duplicate-row
+    # hashes (16 bytes per distinct row, see _SeenRows) and the aggregates.
+    region_df = pd.read_csv(region_path)
+    os.makedirs(out_dir, exist_ok=True)
+
+    rows = _SeenRows()
+    aggregates = StreamingAggregates()
+    offset = 0
+    parts = []
+
+    for i, chunk in enumerate(pd.read_csv(athlete_path, chunksize=chunksize)):
+        chunk = chunk[chunk['Season'] == season]
+        chunk = chunk.merge(region_df, on="NOC", how="left")
+
+        # Keep preprocess()'s row labels: positions among the season's merged rows
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+
+        # Dedupe after the schema is applied so every chunk hashes the same dtypes
+        chunk = preprocessor.encode_medals(chunk)
+        chunk = chunk[rows.first_seen(chunk)]
+
+        path = os.path.join(out_dir, f'part-{i:05d}.feather')
+        table = _partition_table(chunk)
+        feather.write_feather(table, path, compression='uncompressed')
+        parts.append(os.path.basename(path))
+
+        aggregates.update(chunk)
+
+    aggregates.save(out_dir)
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump({'season': season, 'rows': offset, 'parts': parts,
+                   'version': preprocessor.PREPROCESS_VERSION}, f, indent=2)
+    return aggregates
+
+
+def read_ingested(out_dir, columns=None):
+    # Load the partitions back as one frame with the preprocessed schema
+    with open(os.path.join(out_dir, 'manifest.json')) as f:
+        parts = [os.path.join(out_dir, name) for name in json.load(f)['parts']]
+    table = ds.dataset(parts, format='feather').to_table(columns=columns)
+    df = preprocessor.enforce_schema(table.to_pandas())
+
+    # Each partition brought the categories of its own rows; preprocess()
+    # lists them sorted, or in the schema's order for a fixed list (Medal,
+    # which astype leaves as read: unordered dtypes compare equal in any order)
+    for col, dtype in preprocessor.SCHEMA.items():
+        if col not in df.columns:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.reorder_categories(dtype.categories)
+        elif dtype == 'category':
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    return df
+
+
+def read_aggregates(out_dir):
+    # Load the aggregates back, serving the same medal cube, dropdown lists and
+    # over-time series as at the end of ingest_csv
+    agg_dir = os.path.join(out_dir, 'aggregates')
+    aggregates = StreamingAggregates()
+    aggregates.cube = feather.read_feather(os.path.join(agg_dir, 'medal_cube.feather')).set_index(['Year', 'region'])
+    for col in aggregates.pairs:
+        aggregates.pairs[col] = feather.read_feather(os.path.join(agg_dir, f'pairs_{col}.feather'))
+    return aggregates
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stream athlete_events.csv into a partitioned store")
+    parser.add_argument('athlete_path')
+    parser.add_argument('region_path')
+    parser.add_argument('out_dir')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--season', default=preprocessor.DEFAULT_SEASON, choices=preprocessor.SEASONS)
+    args = parser.parse_args()
+    ingest_csv(args.athlete_path, args.region_path, args.out_dir, args.chunksize, args.season)
@@ -0,0 +1,55 @@
+import os
+
+from preprocessor import MEDALS
+
+# Largest k a leaderboard can be asked for; every board keeps this many rows
+MAX_K = int(os.environ.get("OLYMPIC_LEADERBOARD_K", "50"))
+
+LEADERBOARD_COLUMNS = ['Name', 'Sport', 'region', 'Gold', 'Silver', 'Bronze', 'Total']
+
+RANK_COLUMNS = ['Total', 'Gold', 'Silver']
+
+
+def _scoped_boards(df, athletes, scope, max_k):
+    # scope value -> its top max_k athletes by the medals they won in it. An
+    # athlete with medals in several sports (or for several regions) is on
+    # each of their boards with that board's medals only.
+    medal_rows = df.loc[df['Medal'].notna(), ['ID', scope] + MEDALS]
+    counts = medal_rows.groupby(['ID', scope], observed=True, sort=False)[MEDALS].sum().astype('int32')
+    counts['Total'] = counts.sum(axis=1)
+    ranked = counts.reset_index().sort_values(RANK_COLUMNS, ascending=False, kind='stable')
+    top = ranked.groupby(scope, observed=True, sort=False).head(max_k)
+
+    # Name and the other scope column from the athlete table (its first row)
+    other = [col for col in LEADERBOARD_COLUMNS if col not in top.columns]
+    top = top.join(athletes[other], on='ID').set_index('ID')[LEADERBOARD_COLUMNS]
+    return {value: g for value, g in top.groupby(scope, observed=True, sort=False)}
+
+
+class Leaderboards:
+    # Top MAX_K medal-winning athletes globally, per region and per sport,
+    # ranked by total medals, then golds, then silvers. Built once, so a
+    # leaderboard panel is a dict lookup and a head(k).
+
+    def __init__(self, athletes, df, max_k=MAX_K):
+        # athletes is preprocessor.athlete_table(df)
+        self.max_k = max_k
+        medallists = athletes.loc[athletes['Total'] > 0, LEADERBOARD_COLUMNS]
+        ranked = medallists.sort_values(RANK_COLUMNS, ascending=False, kind='stable')
+
+        self.overall = ranked.head(max_k)
+        self.by_region = _scoped_boards(df, athletes, 'region', max_k)
+        self.by_sport = _scoped_boards(df, athletes, 'Sport', max_k)
+
+    def top(self, k=10, region=None, sport=None):
+        # The k best athletes of a region, of a sport, or overall (empty when
+        # the region or sport has no medallists)
+        if not 0 < k <= self.max_k:
+            raise ValueError(f"k must be between 1 and {self.max_k}, got {k}")
+        if region is not None:
+            board = self.by_region.get(region, self.overall.iloc[:0])
+        elif sport is not None:
+            board = self.by_sport.get(sport, self.overall.iloc[:0])
+        else:
+            board = self.overall
+        return board.head(k).reset_index()
@@ -0,0 +1,121 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+import helper
+
+# Column order of every table fetch_medal_tally returns
+TALLY_COLUMNS = ['Gold', 'Bronze', 'Silver', 'Total']
+
+
+class MedalCube:
+    # Gold/Silver/Bronze/Total counts by (Year, region) with the roll-ups the
+    # Medal Tally page needs, each stored as the finished table so a lookup is
+    # a dict access instead of a filter and groupby.
+
+    def __init__(self, cube):
+        self.cube = cube
+
+        # Overall x Overall: every region, summed across the years
+        overall = cube.groupby(level='region', observed=True).sum()
+        self.overall = _by_gold(overall)
+
+        # Overall year, one region: that region's medals per year
+        self.by_region = {
+            region: g.droplevel('region').sort_index().reset_index()
+            for region, g in cube.groupby(level='region', observed=True)
+        }
+
+        # One year, Overall region: every region's medals that year
+        self.by_year = {
+            year: _by_gold(g.droplevel('Year'))
+            for year, g in cube.groupby(level='Year')
+        }
+
+        # One year, one region: position of the row inside by_year[year]
+        self._positions = {
+            (year, region): i
+            for year, table in self.by_year.items()
+            for i, region in enumerate(table['region'])
+        }
+
+        # SortedTally of each (year, region) view, built on first request
+        self._sorted = {}
+
+    def appended(self, new_cube):
+        # A copy extended with years this cube does not have yet. Only the new
+        # years and the regions they touch are recomputed.
+        out = copy.copy(self)
+        out.cube = pd.concat([self.cube, new_cube])
+
+        added = new_cube.groupby(level='region', observed=True).sum()
+        overall = self.overall.set_index('region').add(added, fill_value=0).astype(int)
+        out.overall = _by_gold(overall)
+
+        out.by_region = dict(self.by_region)
+        for region, g in new_cube.groupby(level='region', observed=True):
+            rows = g.droplevel('region').reset_index()
+            if region in out.by_region:
+                rows = pd.concat([out.by_region[region], rows]).sort_values('Year', kind='stable', ignore_index=True)
+            out.by_region[region] = rows
+
+        out._sorted = {}
+        out.by_year = dict(self.by_year)
+        out._positions = dict(self._positions)
+        for year, g in new_cube.groupby(level='Year'):
+            table = _by_gold(g.droplevel('Year'))
+            out.by_year[year] = table
+            out._positions.update({(year, region): i for i, region in enumerate(table['region'])})
+        return out
+
+    def year_region(self, year, region):
+        pos = self._positions.get((year, region))
+        if pos is None:
+            return None
+        return self.by_year[year].iloc[[pos]].reset_index(drop=True)
+
+    def sorted_tally(self, year, region):
+        # The fetch_medal_tally table of a view with its orderings, shared by
+        # every session (two sessions racing on a new view build equal copies)
+        tally = self._sorted.get((year, region))
+        if tally is None:
+            tally = self._sorted.setdefault((year, region), SortedTally(helper.fetch_medal_tally(self, year, region)))
+        return tally
+
+
+class SortedTally:
+    # A medal tally table with the row order of every column, ascending and
+    # descending, computed once. A page is then a slice of a stored ordering,
+    # so its cost depends on the page size and not on the number of rows.
+
+    def __init__(self, table):
+        self.table = table.reset_index(drop=True)
+        self.orders = {}
+        for column in self.table.columns:
+            for ascending in (True, False):
+                # Stable, so ties keep the table's own (most golds first) order
+                order = self.table.sort_values(column, ascending=ascending, kind='stable').index
+                self.orders[column, ascending] = order.to_numpy(dtype=np.intp)
+
+    def __len__(self):
+        return len(self.table)
+
+    def pages(self, size):
+        return max(1, -(-len(self.table) // size))
+
+    def page(self, column, ascending, number, size):
+        # Rows of page `number` (from 1) with `size` rows per page
+        start = (number - 1) * size
+        rows = self.orders[column, ascending][start:start + size]
+        return self.table.take(rows)
+
+
+def _by_gold(x):
+    return x.sort_values('Gold', ascending=False, kind='stable').reset_index()
+
+
+def year_region_counts(medal_df):
+    cube = helper.sum_medals(medal_df, ['Year', 'region'])
+    cube['Total'] = cube['Gold'] + cube['Silver'] + cube['Bronze']
+    return cube[TALLY_COLUMNS]
@@ -1,20 +1,17 @@
 import streamlit as st
-import helper
 import plotly.express as px
-import matplotlib.pylab as plt
+from matplotlib.figure import Figure
 import seaborn as sns
+import geo
+import pipelines
 
-def overall_analysis(df):
-    # Calculate key statistics
-    edition = df['Year'].unique().shape[0] - 1
-    cities = df['City'].unique().shape[0]
-    sports = df['Sport'].unique().shape[0]
-    events = df['Event'].unique().shape[0]
-    athletes = df['Name'].unique().shape[0]
-    nations = df['region'].unique().shape[0]
-    
-    # print(f"Edition: {edition}, Cities: {cities}, Sports: {sports}, Events: {events}, Athletes: {athletes}, Nations: {nations}")
+def overall_analysis(data):
+    # Every block below is built in the page pool (pipelines.py) from the
+    # store's OverallSummary and shown as soon as it is ready
+    with pipelines.Page() as page:
+        _overall_analysis(data, data.overall_summary(), page)
 
+def _overall_analysis(data, summary, page):
     # Page Title
     st.title(" Overall Olympic Analysis")
     # st.markdown("###  **Olympic Games Overview**")
@@ -40,21 +37,26 @@ def overall_analysis(df):
     """, unsafe_allow_html=True)
 
     # Create a Card Layout using st.columns()
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown('<div class="card"> Editions <br> <span class="metric">{}</span></div>'.format(edition), unsafe_allow_html=True)
-        st.markdown('<div class="card"> Sports <br> <span class="metric">{}</span></div>'.format(sports), unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown('<div class="card"> Cities <br> <span class="metric">{}</span></div>'.format(cities), unsafe_allow_html=True)
-        st.markdown('<div class="card"> Events <br> <span class="metric">{}</span></div>'.format(events), unsafe_allow_html=True)
+    def show_cards(slot, stats):
+        edition, cities, sports, events, athletes, nations = stats
+        col1, col2, col3 = slot.container().columns(3)
+
+        with col1:
+            st.markdown('<div class="card"> Editions <br> <span class="metric">{}</span></div>'.format(edition), unsafe_allow_html=True)
+            st.markdown('<div class="card"> Sports <br> <span class="metric">{}</span></div>'.format(sports), unsafe_allow_html=True)
 
-    with col3:
-        st.markdown('<div class="card"> Athletes <br> <span class="metric">{}</span></div>'.format(athletes), unsafe_allow_html=True)
-        st.markdown('<div class="card"> Nations <br> <span class="metric">{}</span></div>'.format(nations), unsafe_allow_html=True)
+        with col2:
+            st.markdown('<div class="card"> Cities <br> <span class="metric">{}</span></div>'.format(cities), unsafe_allow_html=True)
+            st.markdown('<div class="card"> Events <br> <span class="metric">{}</span></div>'.format(events), unsafe_allow_html=True)
+
+        with col3:
+            st.markdown('<div class="card"> Athletes <br> <span class="metric">{}</span></div>'.format(athletes), unsafe_allow_html=True)
+            st.markdown('<div class="card"> Nations <br> <span class="metric">{}</span></div>'.format(nations), unsafe_allow_html=True)
+
+    # Key statistics
+    page.add(lambda: (summary.editions, summary.cities, summary.sports, summary.events, summary.athletes, summary.nations),
+             show_cards)
         
-    nation_over_time=helper.data_over_time(df,'region','No of Countries')
     st.markdown("""
         <style>
             .vertical-margin {
@@ -64,10 +66,9 @@ def overall_analysis(df):
     """, unsafe_allow_html=True)
     st.markdown('<div class="vertical-margin"></div>', unsafe_allow_html=True)
     st.header("Number of Participating Nations Over Time")
-    fig = px.line(nation_over_time, x="Edition", y="No of Countries")
-    st.plotly_chart(fig)
+    page.plotly_chart(('nations_over_time', data.version),
+                      lambda: px.line(summary.nation_over_time, x="Edition", y="No of Countries"))
     
-    event_over_time=helper.data_over_time(df,'Event', 'No of Countries')
     st.markdown("""
         <style>
             .vertical-margin {
@@ -77,10 +78,9 @@ def overall_analysis(df):
     """, unsafe_allow_html=True)
     st.markdown('<div class="vertical-margin"></div>', unsafe_allow_html=True)
     st.header("Number of Events Over Time")
-    fig = px.line(event_over_time, x="Edition", y="No of Countries")
-    st.plotly_chart(fig)
+    page.plotly_chart(('events_over_time', data.version),
+                      lambda: px.line(summary.event_over_time, x="Edition", y="No of Countries"))
 
-    sport_over_time=helper.data_over_time(df,'Sport', 'No of Countries')
     st.markdown("""
         <style>
             .vertical-margin {
@@ -90,10 +90,9 @@ def overall_analysis(df):
     """, unsafe_allow_html=True)
     st.markdown('<div class="vertical-margin"></div>', unsafe_allow_html=True)
     st.header("Number of Sports Over Time")
-    fig = px.line(sport_over_time, x="Edition", y="No of Countries")
-    st.plotly_chart(fig)
+    page.plotly_chart(('sports_over_time', data.version),
+                      lambda: px.line(summary.sport_over_time, x="Edition", y="No of Countries"))
     
-    athlete_over_time=helper.data_over_time(df,'Name', 'No of Athletes')
     st.markdown("""
         <style>
             .vertical-margin {
@@ -103,31 +102,28 @@ def overall_analysis(df):
     """, unsafe_allow_html=True)
     st.markdown('<div class="vertical-margin"></div>', unsafe_allow_html=True)
     st.header("Number of Athletes Over Time")
-    fig = px.line(athlete_over_time, x="Edition", y="No of Athletes")
-    st.plotly_chart(fig)
+    page.plotly_chart(('athletes_over_time', data.version),
+                      lambda: px.line(summary.athlete_over_time, x="Edition", y="No of Athletes"))
     
     st.header("Most Successful Countries Over Time")
 
-    country_medals = df.dropna(subset=['Medal']).groupby(['Year', 'region'])['Medal'].count().reset_index()
-    fig = px.choropleth(country_medals, locations="region", locationmode="country names", 
-                        color="Medal", hover_name="region", animation_frame="Year",
-                        title="Country Medal Distribution Over Time",
-                        color_continuous_scale=px.colors.sequential.Plasma)
+    # Maps show one edition at a time; the animation (all editions in one
+    # payload) is only built when asked for
+    editions = data.country_year_list()[1][1:]
+    animate = st.checkbox("▶ Animate all editions", value=False, key="medal_map_animate")
+    map_year = None if animate else st.select_slider("📅 Edition", editions, value=editions[-1], key="medal_map_year")
 
-    st.plotly_chart(fig)
+    page.plotly_chart(('medal_choropleth', map_year, data.version),
+                      lambda: geo.medal_choropleth(summary.country_medals, data.region_iso3(),
+                                                   "Country Medal Distribution Over Time", map_year))
     
     st.header("👨‍👩‍👧‍👦 Gender Participation Over Time")
 
-    # Create gender participation dataset
-    gender_over_time = df.groupby(['Year', 'Sex'])['Name'].count().reset_index()
-    gender_over_time.rename(columns={'Name': 'Count'}, inplace=True)
-
-    # Default Graph (Both Male & Female)
-    fig_both = px.line(gender_over_time, x="Year", y="Count", color="Sex", 
-                    markers=True, title="Male vs Female Participation Over the Years",
-                    color_discrete_map={'M': 'blue', 'F': 'red'})
-
-    # st.plotly_chart(fig_both, key="both_graph")  # Assigning a unique key
+    # Default Graph (Both Male & Female), only built when it is not cached yet
+    def build_both():
+        return px.line(summary.gender_over_time, x="Year", y="Count", color="Sex", 
+                       markers=True, title="Male vs Female Participation Over the Years",
+                       color_discrete_map={'M': 'blue', 'F': 'red'})
 
     # ------------------------------
     # User Selection for More Graphs
@@ -143,27 +139,31 @@ def overall_analysis(df):
     # 1️⃣ Male Participation Only (Line Graph)
     # ------------------------------
     if gender_option == "📈 Male Participation":
-        male_data = gender_over_time[gender_over_time["Sex"] == "M"]
-        fig_male = px.line(male_data, x="Year", y="Count", markers=True,
-                        title="📈 Male Participation Over the Years",
-                        line_shape="linear", color_discrete_sequence=['blue'])
-        st.plotly_chart(fig_male, key="male_graph")  # Assigning a unique key
+        def build_male():
+            gender_over_time = summary.gender_over_time
+            male_data = gender_over_time[gender_over_time["Sex"] == "M"]
+            return px.line(male_data, x="Year", y="Count", markers=True,
+                           title="📈 Male Participation Over the Years",
+                           line_shape="linear", color_discrete_sequence=['blue'])
+        page.plotly_chart(('gender_over_time', 'M', data.version), build_male, key="male_graph")  # Assigning a unique key
 
     # ------------------------------
     # 2️⃣ Female Participation Only (Line Graph)
     # ------------------------------
     elif gender_option == "📉 Female Participation":
-        female_data = gender_over_time[gender_over_time["Sex"] == "F"]
-        fig_female = px.line(female_data, x="Year", y="Count", markers=True,
-                            title="📉 Female Participation Over the Years",
-                            line_shape="linear", color_discrete_sequence=['red'])
-        st.plotly_chart(fig_female, key="female_graph")  # Assigning a unique key
+        def build_female():
+            gender_over_time = summary.gender_over_time
+            female_data = gender_over_time[gender_over_time["Sex"] == "F"]
+            return px.line(female_data, x="Year", y="Count", markers=True,
+                           title="📉 Female Participation Over the Years",
+                           line_shape="linear", color_discrete_sequence=['red'])
+        page.plotly_chart(('gender_over_time', 'F', data.version), build_female, key="female_graph")  # Assigning a unique key
 
     # ------------------------------
     # 3️⃣ Both Male & Female (Default)
     # ------------------------------
     elif gender_option == "📊 Both (Male & Female)":
-        st.plotly_chart(fig_both, key="both_graph_again")  # Assigning a different key
+        page.plotly_chart(('gender_over_time', 'both', data.version), build_both, key="both_graph_again")  # Assigning a different key
 
     # ------------------------------
     # 4️⃣ Choropleth Map (Geographical Distribution of Gender Participation)
@@ -171,60 +171,53 @@ def overall_analysis(df):
     elif gender_option == "🌍 Choropleth Map":
         st.header("🌍 Global Gender Participation Over Time")
 
-        # Prepare Data for Choropleth
-        gender_map_data = df.groupby(['Year', 'region', 'Sex'])['Name'].count().reset_index()
-        gender_map_data.rename(columns={'Name': 'Count'}, inplace=True)
+        animate = st.checkbox("▶ Animate all editions", value=False, key="gender_map_animate")
+        map_year = None if animate else st.select_slider("📅 Edition", editions, value=editions[-1], key="gender_map_year")
 
         # Plot Choropleth Map
-        fig_choropleth = px.choropleth(
-            gender_map_data, locations="region", locationmode="country names",
-            color="Count", hover_name="region", animation_frame="Year",
-            facet_col="Sex", title="🌍 Global Male & Female Participation Over Time",
-            color_continuous_scale=px.colors.sequential.Plasma
-        )
-        st.plotly_chart(fig_choropleth, key="choropleth_map")  # Assigning a unique key
+        def build_choropleth():
+            return geo.gender_choropleth(summary.gender_map_data, data.region_iso3(),
+                                         "🌍 Global Male & Female Participation Over Time", map_year)
+        page.plotly_chart(('gender_choropleth', map_year, data.version), build_choropleth, key="choropleth_map")  # Assigning a unique key
         
     st.header("Sport-wise Athlete Participation")
 
-    sport_count = df.groupby('Sport')['Name'].nunique().reset_index()
-    sport_count = sport_count.sort_values('Name', ascending=False).head(10)  # Top 10 sports
-
-    fig = px.bar(sport_count, x='Name', y='Sport', orientation='h', 
-                title="Top 10 Sports with Most Athletes", 
-                labels={'Name': 'Number of Athletes', 'Sport': 'Sport'},
-                color='Name', color_continuous_scale='Bluered')
-
-    st.plotly_chart(fig)    
+    # Top 10 sports
+    page.plotly_chart(('sport_participation', data.version),
+                      lambda: px.bar(summary.sport_count, x='Athletes', y='Sport', orientation='h', 
+                                     title="Top 10 Sports with Most Athletes", 
+                                     labels={'Athletes': 'Number of Athletes', 'Sport': 'Sport'},
+                                     color='Athletes', color_continuous_scale='Bluered'))
     
     st.header("Top Medal-Winning Athletes")
 
-    # Prepare Data
-    top_athletes = df[df['Medal'].notna()].groupby(['Name', 'Sport', 'region'])['Medal'].count().reset_index()
-    top_athletes = top_athletes.sort_values('Medal', ascending=False).head(10)
-
     # Display Table
     # st.dataframe(top_athletes.style.format({'Medal': '{}🏅'}))
 
     # Bar Graph Visualization
     st.subheader("Top 10 Athletes with the Most Medals")
 
-    fig = px.bar(
-        top_athletes, x="Medal", y="Name", color="Sport",
-        orientation='h',  # Horizontal Bar Chart
-        text="Medal", 
-        labels={"Medal": "Total Medals", "Name": "Athlete"},
-        color_discrete_sequence=px.colors.qualitative.Set1
-    )
+    def build_top_athletes():
+        fig = px.bar(
+            summary.top_athletes, x="Medal", y="Name", color="Sport",
+            orientation='h',  # Horizontal Bar Chart
+            text="Medal", 
+            labels={"Medal": "Total Medals", "Name": "Athlete"},
+            color_discrete_sequence=px.colors.qualitative.Set1
+        )
 
-    # Improve layout
-    fig.update_layout(yaxis=dict(categoryorder="total ascending"))  # Sort by medal count
+        # Improve layout
+        fig.update_layout(yaxis=dict(categoryorder="total ascending"))  # Sort by medal count
+        return fig
 
-    st.plotly_chart(fig, use_container_width=True)  # Display chart
+    page.plotly_chart(('top_athletes', data.version), build_top_athletes, use_container_width=True)  # Display chart
     
     st.title("No of Events over time(Every Sport):")
     
-    x=df.drop_duplicates(['Year','Sport','Event'])
-    
-    fig,ax=plt.subplots(figsize=(20,20))
-    ax=sns.heatmap(x.pivot_table(index='Sport',columns='Year',values='Event',aggfunc='count').fillna(0).astype('int'),annot=True)
-    st.pyplot(fig)
\ No newline at end of file
+    def build_events_heatmap():
+        # A Figure of its own rather than pyplot's global state, which other threads share
+        fig=Figure(figsize=(20,20))
+        ax=sns.heatmap(summary.events_heatmap,annot=True,ax=fig.subplots())
+        return fig
+
+    page.pyplot(('events_heatmap', data.version), build_events_heatmap)
\ No newline at end of file
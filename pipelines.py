@@ -0,0 +1,72 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import streamlit as st
+
+import figure_cache
+import profiling
+
+# Threads that build page content (data steps and figures) side by side,
+# shared by every session of the process. The default, 1, builds everything in
+# order on the script thread: on a single core the pool was slower than the
+# serial page (benchmarks 'Overall Analysis' vs 'Overall Analysis serial'),
+# so opt in on multi-core hosts after measuring there with --page-workers
+WORKERS = int(os.environ.get("OLYMPIC_PAGE_WORKERS", "1"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(WORKERS, thread_name_prefix='page-build')
+        return _pool
+
+
+class Page:
+    # Reserves a placeholder for every block in page order and hands its build
+    # to the pool; finish() fills each placeholder on the script thread as soon
+    # as its build is done, so quick charts appear while slow ones still run.
+    # Builds only read the store and render payloads, Streamlit calls stay in
+    # render().
+
+    def __init__(self, workers=None):
+        self.workers = WORKERS if workers is None else workers
+        self._pending = {}
+
+    def add(self, build, render):
+        # build() runs in the pool, render(placeholder, result) on the script thread
+        slot = st.empty()
+        if self.workers <= 1:
+            render(slot, build())
+            return
+        slot.caption("⏳ Loading…")
+        self._pending[_executor().submit(profiling.bind(build))] = (slot, render)
+
+    def plotly_chart(self, cache_key, build, **kwargs):
+        # As figure_cache.plotly_chart, in the page's slot order
+        self.add(lambda: figure_cache.plotly_payload(cache_key, build),
+                 lambda slot, payload: figure_cache.show_plotly(slot, payload, **kwargs))
+
+    def pyplot(self, cache_key, build):
+        self.add(lambda: figure_cache.pyplot_payload(cache_key, build), figure_cache.show_png)
+
+    def finish(self):
+        pending, self._pending = self._pending, {}
+        for future in as_completed(pending):
+            slot, render = pending[future]
+            render(slot, future.result())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finish()
+        else:
+            # The rerun was stopped: builds already running still fill the caches
+            for future in self._pending:
+                future.cancel()
@@ -0,0 +1,95 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import data_cache
+import preprocessor
+
+# The store of each worker process, loaded once by _init_worker
+_data = None
+
+
+def warm_country(data, country):
+    # Builds every figure of one country page into the figure cache (memory
+    # and disk tier), skipping the ones already cached for this dataset
+    # version. Returns the number of figures built.
+    import country_wise_analysis
+    import figure_cache
+
+    payloads = {'plotly': figure_cache.plotly_payload, 'pyplot': figure_cache.pyplot_payload}
+    has_medals = country_wise_analysis.country_has_medals(data, country)
+    built = 0
+    for name, kind, figure in country_wise_analysis.COUNTRY_FIGURES:
+        # The page shows a warning instead of these for countries without medals
+        if name in country_wise_analysis.MEDAL_FIGURES and not has_medals:
+            continue
+        misses = figure_cache.cache.misses
+        payloads[kind]((name, country, data.version), lambda: figure(data, country))
+        built += figure_cache.cache.misses - misses
+    return built
+
+
+def _load(athlete_path, region_path, season):
+    import store
+    version = data_cache.cache_key(athlete_path, region_path, season)
+    return store.DataStore(data_cache.load_preprocessed(athlete_path, region_path, season), version, season)
+
+
+def _init_worker(athlete_path, region_path, season):
+    global _data
+    import matplotlib
+    matplotlib.use('Agg')
+    import country_wise_analysis  # noqa: F401 (imported before the first country is timed)
+    _data = _load(athlete_path, region_path, season)
+
+
+def _warm_in_worker(country):
+    start = time.perf_counter()
+    built = warm_country(_data, country)
+    return country, built, time.perf_counter() - start
+
+
+def main():
+    # Nightly warm-up: every country page of the current dataset, rendered
+    # across a process pool into the figure cache's disk tier, where the
+    # app's processes pick the figures up on first request
+    parser = argparse.ArgumentParser(description="Precompute the figures of every country page")
+    parser.add_argument('athlete_path', nargs='?', default='athlete_events.csv')
+    parser.add_argument('region_path', nargs='?', default='noc_regions.csv')
+    parser.add_argument('--season', nargs='+', default=preprocessor.SEASONS, choices=preprocessor.SEASONS,
+                        help="seasons to render (default: all)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--prune', action='store_true',
+                        help="clear the disk tier first, dropping figures of older dataset versions")
+    args = parser.parse_args()
+
+    import figure_cache
+
+    if args.prune:
+        removed = figure_cache.cache.prune_disk(time.time())
+        print(f"removed {removed} cached figures")
+
+    for season in args.season:
+        start = time.perf_counter()
+        # Prepared once here (Feather cache, query backend) so the workers only read them
+        data = _load(args.athlete_path, args.region_path, season)
+        data.backend()
+        countries = data.country_year_list()[0][1:]
+
+        chunksize = max(1, len(countries) // (args.workers * 4))
+        built = 0
+        slowest = (None, 0.0)
+        with ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                 initargs=(args.athlete_path, args.region_path, season)) as pool:
+            for country, count, seconds in pool.map(_warm_in_worker, countries, chunksize=chunksize):
+                built += count
+                slowest = max(slowest, (country, seconds), key=lambda x: x[1])
+
+        print(f"{season}: {len(countries)} countries, {built} figures built with {args.workers} workers "
+              f"in {time.perf_counter() - start:.1f}s (slowest: {slowest[0]}, {slowest[1]:.2f}s)")
+    print(f"figures in {figure_cache.cache.disk_dir}")
+
+
+if __name__ == '__main__':
+    main()
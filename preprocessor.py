@@ -1,15 +1,85 @@
 import pandas as pd
 
-def preprocess(df,region_df):
+# Bump whenever preprocess() changes its output so cached copies are rebuilt
+PREPROCESS_VERSION = 2
+
+MEDALS = ['Gold', 'Silver', 'Bronze']
+
+# Every season is preprocessed, cached and loaded on its own (data_cache.py),
+# so a page only reads the rows of the season it shows
+SEASONS = ['Summer', 'Winter']
+DEFAULT_SEASON = 'Summer'
+
+# A team event awards one medal however many athletes shared it, so medal
+# counts are taken over one row per unique value of this key
+MEDAL_EVENT_KEY = ['Team', 'NOC', 'Games', 'Year', 'City', 'Sport', 'Event', 'Medal']
+
+# Columns of the athlete table taken from each athlete's first row. The age,
+# height and weight charts read one row per athlete from these.
+ATHLETE_COLUMNS = ['Name', 'Sex', 'Age', 'Height', 'Weight', 'Team', 'NOC', 'region', 'Sport', 'Medal']
+
+# Column dtypes of the preprocessed frame. Repeated strings become categoricals,
+# numbers are narrowed to the smallest type that holds them.
+SCHEMA = {
+    'ID': 'int32',
+    'Name': 'category',
+    'Sex': 'category',
+    'Age': 'float32',
+    'Height': 'float32',
+    'Weight': 'float32',
+    'Team': 'category',
+    'NOC': 'category',
+    'Games': 'category',
+    'Year': 'int16',
+    'Season': 'category',
+    'City': 'category',
+    'Sport': 'category',
+    'Event': 'category',
+    'Medal': pd.CategoricalDtype(MEDALS),
+    'region': 'category',
+    'notes': 'category',
+    'Gold': 'int8',
+    'Silver': 'int8',
+    'Bronze': 'int8',
+}
+
+def enforce_schema(df):
+    return df.astype({col: dtype for col, dtype in SCHEMA.items() if col in df.columns})
+
+def encode_medals(df):
+    # A fixed category list guarantees all three dummy columns exist
+    df=df.assign(Medal=df['Medal'].astype(SCHEMA['Medal']))
     
-    df=df[df['Season']=='Summer']
+    df=pd.concat([df,pd.get_dummies(df['Medal'])],axis=1)
     
-    df=df.merge(region_df,on="NOC",how="left")
+    return enforce_schema(df)
+
+def preprocess(df,region_df,season=DEFAULT_SEASON):
     
-    df.drop_duplicates(inplace=True)
+    df=df[df['Season']==season]
     
-    df=pd.concat([df,pd.get_dummies(df['Medal'])],axis=1)
+    df=df.merge(region_df,on="NOC",how="left")
     
-    df[['Gold', 'Silver', 'Bronze']] = df[['Gold', 'Silver', 'Bronze']].astype(int)
+    df.drop_duplicates(inplace=True)
     
-    return df
\ No newline at end of file
+    return encode_medals(df)
+
+def preprocess_seasons(df,region_df):
+    # preprocess() of every season from one parsed CSV
+    return {season: preprocess(df, region_df, season) for season in SEASONS}
+
+def medal_events(df):
+    # One row per team and event entry. Entries without a medal are kept so that
+    # tallies still list the regions and years that won nothing.
+    return df.drop_duplicates(subset=MEDAL_EVENT_KEY)
+
+def athlete_table(df):
+    # One row per athlete, indexed by the dataset's ID (athletes sharing a name
+    # stay apart). Gold/Silver/Bronze/Total count medals over all of the
+    # athlete's rows and Sports the distinct sports they entered.
+    athletes = df[~df['ID'].duplicated()].set_index('ID')[ATHLETE_COLUMNS]
+    by_id = df.groupby('ID', sort=False)
+    medals = by_id[MEDALS].sum().astype('int32')
+    medals['Total'] = medals.sum(axis=1)
+    medals['Sports'] = by_id['Sport'].nunique().astype('int32')
+    return athletes.join(medals)
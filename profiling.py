@@ -0,0 +1,217 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# Set to show the startup report in the app's sidebar
+SHOW_REPORT = os.environ.get("OLYMPIC_STARTUP_REPORT", "") not in ("", "0")
+
+# Set to record every data-prep step and figure build of each rerun, logged as
+# JSON lines and shown in the app's diagnostics panel. Off, section() is a no-op.
+INSTRUMENT = os.environ.get("OLYMPIC_INSTRUMENT", "") not in ("", "0")
+
+# Set as well to add each section's traced memory delta. tracemalloc then
+# traces every allocation of the process until it exits, which slows
+# allocation-heavy steps, so the wall and CPU times of such reruns run high.
+TRACE_MEMORY = os.environ.get("OLYMPIC_INSTRUMENT_MEMORY", "") not in ("", "0")
+
+# One JSON object per line: a 'section' line per recorded step, a 'rerun' line per rerun
+log = logging.getLogger("olympic.instrumentation")
+
+PAGES = [" Medal Tally", " Overall Analysis", " Country-wise Analysis", " Athlete-wise Analysis"]
+
+# (page, phase, name) -> seconds, for the first time each step ran in this
+# process. Later runs find the module imported or the table built, so the
+# first run is the cold-start cost.
+timings = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def timed(page, phase, name):
+    # phase is 'import' for module imports and 'data' for loading or deriving tables
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            timings.setdefault((page.strip(), phase, name), elapsed)
+
+
+def report():
+    # The recorded steps in the order they first ran, as a DataFrame
+    import pandas as pd
+    with _lock:
+        rows = [(page, phase, name, seconds) for (page, phase, name), seconds in timings.items()]
+    return pd.DataFrame(rows, columns=['Page', 'Phase', 'Step', 'Seconds'])
+
+
+def show_report(st):
+    if not SHOW_REPORT:
+        return
+    table = report()
+    with st.sidebar.expander("⏱ Startup time"):
+        st.dataframe(table.groupby(['Page', 'Phase'], sort=False)['Seconds'].sum().round(3).reset_index(),
+                     hide_index=True)
+        st.dataframe(table.round({'Seconds': 3}), hide_index=True)
+
+
+_NOOP = nullcontext()
+_current = threading.local()
+_rerun_ids = itertools.count(1)
+
+
+def section(name, kind):
+    # Times the enclosed step: kind is 'load', 'derived', 'query' or 'figure'.
+    # Costs one global lookup when instrumentation is off.
+    if not INSTRUMENT:
+        return _NOOP
+    return _section(name, kind)
+
+
+@contextmanager
+def _section(name, kind):
+    rerun = getattr(_current, 'rerun', None)
+    depth = getattr(_current, 'depth', 0)
+    _current.depth = depth + 1
+    mem_start = tracemalloc.get_traced_memory()[0] if TRACE_MEMORY else None
+    cpu_start = time.thread_time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record = {
+            'event': 'section',
+            'rerun': rerun['id'] if rerun else None,
+            'page': rerun['page'] if rerun else None,
+            'name': name,
+            'kind': kind,
+            'depth': depth,
+            'thread': threading.current_thread().name,
+            'wall_ms': round((time.perf_counter() - start) * 1000, 3),
+            'cpu_ms': round((time.thread_time() - cpu_start) * 1000, 3),
+        }
+        if mem_start is not None:
+            record['mem_delta_kb'] = round((tracemalloc.get_traced_memory()[0] - mem_start) / 1024, 1)
+        _current.depth = depth
+        if rerun is not None:
+            rerun['sections'].append(record)
+        log.info(json.dumps(record))
+
+
+def bind(fn):
+    # fn, recording its sections into the calling thread's rerun wherever it
+    # runs: wrap work handed to a pool thread (pipelines.py) with it. Memory
+    # deltas are process-wide, so sections running side by side share theirs.
+    rerun = getattr(_current, 'rerun', None)
+    if not INSTRUMENT or rerun is None:
+        return fn
+
+    def run(*args, **kwargs):
+        _current.rerun, _current.depth = rerun, 0
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.rerun = None
+    return run
+
+
+def start_rerun(page):
+    # Called at the top of every script run; sections recorded on this thread
+    # until finish_rerun belong to it
+    if not INSTRUMENT:
+        return
+    if TRACE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _current.rerun = {'id': next(_rerun_ids), 'page': page.strip(), 'sections': [],
+                      'thread': threading.current_thread().name,
+                      'start': time.perf_counter(), 'cpu_start': time.thread_time()}
+    _current.depth = 0
+
+
+def finish_rerun(st):
+    # Logs the rerun's totals and shows its sections in the diagnostics panel
+    rerun = getattr(_current, 'rerun', None)
+    if not INSTRUMENT or rerun is None:
+        return
+    _current.rerun = None
+    sections = rerun['sections']
+    # CPU time of the script thread plus that of the work it handed to pool threads
+    cpu = time.thread_time() - rerun['cpu_start']
+    cpu += sum(s['cpu_ms'] for s in sections if s['depth'] == 0 and s['thread'] != rerun['thread']) / 1000
+    log.info(json.dumps({
+        'event': 'rerun',
+        'rerun': rerun['id'],
+        'page': rerun['page'],
+        'wall_ms': round((time.perf_counter() - rerun['start']) * 1000, 3),
+        'cpu_ms': round(cpu * 1000, 3),
+        'sections': len(sections),
+        'section_wall_ms': round(sum(s['wall_ms'] for s in sections if s['depth'] == 0), 3),
+    }))
+
+    import pandas as pd
+    with st.sidebar.expander("🩺 Diagnostics (this rerun)"):
+        if not sections:
+            st.write("Nothing was computed: every table and figure came from a cache.")
+            return
+        table = pd.DataFrame(sections)
+        table['name'] = ['  ' * depth + name for depth, name in zip(table['depth'], table['name'])]
+        columns = ['name', 'kind', 'thread', 'wall_ms', 'cpu_ms'] + (['mem_delta_kb'] if TRACE_MEMORY else [])
+        st.dataframe(table[columns], hide_index=True)
+
+
+if INSTRUMENT and not log.handlers:
+    # Plain lines on stderr unless the deployment configured its own handler
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
+def main():
+    # Visits every page once in a fresh process, in sidebar order, and prints
+    # what each step cost on first use. Shared startup is listed under 'app';
+    # each page only pays for the imports and tables it adds.
+    parser = argparse.ArgumentParser(description="Cold-start time of the dashboard, per page")
+    parser.add_argument('--app', default='app.py')
+    parser.add_argument('--timeout', type=float, default=600)
+    args = parser.parse_args()
+
+    # The app records into the imported module, not this __main__ copy
+    import profiling
+
+    start = time.perf_counter()
+    with profiling.timed('harness', 'import', 'streamlit.testing'):
+        from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(args.app, default_timeout=args.timeout)
+
+    first_paint = {}
+    for page in PAGES:
+        page_start = time.perf_counter()
+        if page == PAGES[0]:
+            app.run()
+        else:
+            app.radio(key="page").set_value(page).run()
+        first_paint[page.strip()] = time.perf_counter() - page_start
+        if app.exception:
+            raise SystemExit(f"{page.strip()} failed: {app.exception[0].message}")
+
+    table = profiling.report()
+    print(table.to_string(index=False, float_format='{:.3f}'.format))
+    print()
+    print(table.groupby(['Page', 'Phase'], sort=False)['Seconds'].sum().to_string(float_format='{:.3f}'.format))
+    print()
+    for page, seconds in first_paint.items():
+        print(f"{page}: first render {seconds:.3f}s")
+    print(f"total: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+from matplotlib.lines import Line2D
+
+# Sports with more plottable athletes than this are drawn from 2-D bins instead of one point per athlete
+LOD_POINTS = int(os.environ.get("OLYMPIC_SCATTER_LOD_POINTS", "5000"))
+
+# Cell size of the binned chart: (kg, cm)
+CELL = (2.0, 2.0)
+
+# Largest marker area (points²), given to the most crowded cell
+MAX_MARKER = 160
+
+
+class HeightWeightGrid:
+    # Athletes counted per (medal class, weight cell, height cell). The number of
+    # non-empty cells is bounded by the height/weight range, not the athlete
+    # count, so drawing the grid costs the same for 500 or 50,000 athletes.
+
+    def __init__(self, df, cell=CELL):
+        weight = df['Weight'].to_numpy(dtype=float)
+        height = df['Height'].to_numpy(dtype=float)
+        valid = ~(np.isnan(weight) | np.isnan(height))
+        self.cell = cell
+        self.points = int(valid.sum())
+
+        # Medal categories in order, plus 'No Medal' for the missing ones
+        medal = df['Medal'].cat
+        self.labels = list(medal.categories) + ['No Medal']
+        medal_codes = np.where(medal.codes < 0, len(self.labels) - 1, medal.codes)[valid]
+        x = np.floor(weight[valid] / cell[0]).astype(np.int64)
+        y = np.floor(height[valid] / cell[1]).astype(np.int64)
+
+        # One np.unique over (medal, x, y) rows gives every occupied cell and its count
+        cells, counts = np.unique(np.column_stack((medal_codes, x, y)), axis=0, return_counts=True)
+        self.cells = {}
+        for code, label in enumerate(self.labels):
+            mine = cells[:, 0] == code
+            self.cells[label] = ((cells[mine, 1] + 0.5) * cell[0], (cells[mine, 2] + 0.5) * cell[1], counts[mine])
+        self.max_count = int(counts.max()) if len(counts) else 0
+
+    def draw(self, ax, palette, alpha=0.7):
+        # One marker per occupied cell and medal class, its area growing with the
+        # square root of the athlete count. Medal classes are drawn last so they
+        # stay visible over the far more numerous non-medallists.
+        for label in reversed(self.labels):
+            x, y, counts = self.cells[label]
+            if len(counts):
+                sizes = MAX_MARKER * np.sqrt(counts / self.max_count)
+                ax.scatter(x, y, s=sizes, color=palette[label], alpha=alpha, linewidths=0)
+        return [Line2D([], [], marker='o', linestyle='', color=palette[label], label=label)
+                for label in self.labels if len(self.cells[label][2])]
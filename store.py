@@ -0,0 +1,187 @@
+import threading
+
+import pandas as pd
+import streamlit as st
+
+import backends
+import binning
+import data_cache
+import helper
+import incremental
+import indexes
+import leaderboard
+import medal_cube
+import preprocessor
+import profiling
+import summary
+
+# With copy-on-write every frame derived from the shared dataset (slices, dedupes,
+# columns assigned by a view) gets its own data the moment it is written to.
+pd.set_option("mode.copy_on_write", True)
+
+
+class DataStore:
+    # One preprocessed dataset (the rows of one season) plus the tables
+    # derived from it, shared read-only by every session of the process. A new
+    # CSV version gets a new store.
+
+    def __init__(self, df, version, season=preprocessor.DEFAULT_SEASON):
+        self._df = df
+        self.version = version
+        self.season = season
+        self._derived = {}
+        self._lock = threading.RLock()
+        self._build_locks = {}
+
+    @property
+    def df(self):
+        # A shallow copy: free to take, and under copy-on-write any mutation a
+        # view makes lands in the copy instead of the shared frame
+        return self._df.copy(deep=False)
+
+    def derived(self, name, build):
+        # Build a derived table once per dataset version, whichever session asks
+        # first. Each table has its own lock, so independent tables build at the
+        # same time (pipelines.py). A build racing append_edition lands in the
+        # dict the append replaces, never in the new one.
+        derived = self._derived
+        if name not in derived:
+            with self._build_locks.setdefault(name, threading.RLock()):
+                if name not in derived:
+                    with profiling.section(f'derived:{name}', 'derived'):
+                        derived[name] = build(self._df)
+        value = derived[name]
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return value.copy(deep=False)
+        return value
+
+    def backend(self):
+        # Engine for the aggregate queries, chosen by OLYMPIC_BACKEND (backends.py)
+        return self.derived('backend', lambda df: backends.open_backend(self))
+
+    def medal_events(self):
+        return self.derived('medal_events', preprocessor.medal_events)
+
+    def medal_cube(self):
+        return self.derived('medal_cube', lambda df: medal_cube.MedalCube(self.backend().year_region_counts()))
+
+    def athletes(self):
+        # One row per athlete ID with its medal counts (preprocessor.athlete_table)
+        return self.derived('athletes', preprocessor.athlete_table)
+
+    def leaderboards(self):
+        # Top-k medal-winning athletes overall, per region and per sport
+        return self.derived('leaderboards', lambda df: leaderboard.Leaderboards(self.athletes(), df))
+
+    def attribute_bins(self):
+        # Age/Height/Weight/BMI bin counts by sex, medal and sport
+        return self.derived('attribute_bins', binning.AttributeBins)
+
+    def age_density(self, table):
+        # Binned ages of 'df' or 'athletes' by medal and sport, with cached KDE curves
+        import density  # plotly, only loaded by the pages that chart ages
+        frame = self.df if table == 'df' else getattr(self, table)()
+        return self.derived(f'{table}_age_density', lambda df: density.BinnedDensity(frame))
+
+    def height_weight_grid(self, sport):
+        # Binned heights and weights of a sport's athletes by medal class
+        import scatter_lod  # matplotlib, only loaded by the Athlete-wise page
+        return self.derived(f'height_weight_grid_{sport}',
+                            lambda df: scatter_lod.HeightWeightGrid(self.select('athletes', Sport=sport)))
+
+    def select(self, table, **filters):
+        # Rows of 'df', 'medal_events' or 'athletes' matching the filters
+        # (e.g. region='India', Medal=MEDALS), found through that table's RowIndex
+        frame = self.df if table == 'df' else getattr(self, table)()
+        index = self.derived(f'{table}_index', lambda df: indexes.RowIndex(frame))
+        return index.select(frame, **filters)
+
+    def country_year_list(self):
+        country, years = self.derived('country_year_list', lambda df: self.backend().country_year_list())
+        return list(country), list(years)
+
+    def region_iso3(self):
+        # region -> ISO-3 code, from the NOC/region pairs merged in from noc_regions.csv
+        import geo  # plotly, only loaded by the Overall page
+        return self.derived('region_iso3', lambda df: geo.region_iso3(df[['NOC', 'region']]))
+
+    def overall_summary(self):
+        return self.derived('overall_summary', lambda df: summary.OverallSummary(self))
+
+    def data_over_time(self, col, y_label):
+        counts = self.derived(f'over_time_{col}', lambda df: self.backend().over_time(col))
+        return counts.rename(columns={'count': y_label})
+
+    def append_edition(self, new_rows, region_df):
+        # Add a new Games edition (raw athlete_events rows for years not yet in
+        # the store). Only the new rows are preprocessed, deduplicated and
+        # grouped; the medal events, medal cube, dropdown lists and over-time
+        # series are extended with the result. Other derived tables are dropped
+        # and rebuilt on next use.
+        with self._lock:
+            country_year = self.country_year_list()
+            new_df = incremental.prepare_edition(new_rows, region_df, country_year[1][1:], self._df.index.max() + 1,
+                                                self.season)
+            new_events = preprocessor.medal_events(new_df)
+
+            derived = {
+                'medal_events': incremental.concat_aligned(self.medal_events(), new_events),
+                'medal_cube': self.medal_cube().appended(medal_cube.year_region_counts(new_events)),
+                'country_year_list': incremental.extend_country_year_list(country_year, new_df),
+            }
+            for col in helper.OVER_TIME_COLUMNS:
+                counts = self.data_over_time(col, 'count')
+                derived[f'over_time_{col}'] = incremental.extend_over_time(counts, new_df, col)
+
+            version = f"{self.version}+{incremental.edition_digest(new_rows)}"
+            derived['backend'] = self.backend().appended(new_df, version)
+
+            self._df = incremental.concat_aligned(self._df, new_df)
+            self._derived = derived
+            self.version = version
+
+
+def verify_append(data, athlete_df, region_df):
+    # Raises AssertionError unless the incrementally updated store matches a
+    # full rebuild from the complete raw athlete_events rows, its query
+    # backend included
+    rebuilt = DataStore(preprocessor.preprocess(athlete_df, region_df, data.season), f'{data.version}-rebuild',
+                        data.season)
+    incremental.assert_same_tables(data, rebuilt)
+    for query, args in backends.parity_queries(rebuilt.country_year_list()[0]):
+        backends.assert_same_result(getattr(data.backend(), query)(*args), getattr(rebuilt.backend(), query)(*args))
+
+
+class SeasonStores:
+    # The stores of one CSV version, each season loaded on its first request:
+    # a deployment that only ever shows Summer never holds the Winter rows
+
+    def __init__(self, athlete_path, region_path):
+        self._paths = (athlete_path, region_path)
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def get(self, season):
+        store = self._stores.get(season)
+        if store is None:
+            with self._lock:
+                store = self._stores.get(season)
+                if store is None:
+                    with st.spinner(f"Loading {season} Olympics dataset..."):
+                        df = data_cache.load_preprocessed(*self._paths, season)
+                    store = DataStore(df, data_cache.cache_key(*self._paths, season), season)
+                    self._stores[season] = store
+        return store
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_stores(athlete_path, region_path, version):
+    # max_entries=1 drops the previous version from the cache when the CSVs
+    # change; sessions still rendering from it keep it alive until they finish
+    return SeasonStores(athlete_path, region_path)
+
+
+def get_store(athlete_path="athlete_events.csv", region_path="noc_regions.csv", season=preprocessor.DEFAULT_SEASON):
+    # The version is a content hash of the CSVs, memoized on their size and mtime
+    version = data_cache.cache_key(athlete_path, region_path)
+    return _load_stores(athlete_path, region_path, version).get(season)
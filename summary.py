@@ -0,0 +1,80 @@
+def key_statistics(data):
+    # Key statistics for the cards (distinct values, missing counted once)
+    df = data.df
+    return {
+        # The 1906 Intercalated Games are not an official edition
+        'editions': df['Year'].nunique() - int((df['Year'] == 1906).any()),
+        'cities': df['City'].nunique(dropna=False),
+        'sports': df['Sport'].nunique(dropna=False),
+        'events': df['Event'].nunique(dropna=False),
+        'athletes': len(data.athletes()),
+        'nations': df['region'].nunique(dropna=False),
+    }
+
+
+def year_region_sex(data):
+    # One pass feeds the medal map and both gender views: entries and medals
+    # per (Year, region, Sex), keeping missing region/sex as their own groups
+    counts = data.backend().year_region_sex_counts()
+
+    country_medals = counts.groupby(level=['Year', 'region'], observed=True)['Medal'].sum()
+    gender_map_data = counts['Count'].reset_index()
+    return {
+        'country_medals': country_medals[country_medals > 0].reset_index(),
+        'gender_over_time': counts.groupby(level=['Year', 'Sex'], observed=True)['Count'].sum().reset_index(),
+        'gender_map_data': gender_map_data.dropna(subset=['region', 'Sex']).reset_index(drop=True),
+    }
+
+
+def sport_tables(data):
+    sport_count = data.backend().sport_athletes()
+    # Distinct events of every sport in every edition
+    events_heatmap = (data.backend().sport_year_events().set_index(['Sport', 'Year'])['Event']
+                      .unstack(fill_value=0).astype('int'))
+    return {
+        'sport_count': sport_count.sort_values('Athletes', ascending=False).head(10),  # Top 10 sports
+        'events_heatmap': events_heatmap,
+    }
+
+
+def athlete_tables(data):
+    return {'top_athletes': data.leaderboards().top(10).rename(columns={'Total': 'Medal'})}
+
+
+# The over-time series are maintained by the store (and extended in place by
+# append_edition): field -> (column, y label)
+_OVER_TIME = {
+    'nation_over_time': ('region', 'No of Countries'),
+    'event_over_time': ('Event', 'No of Countries'),
+    'sport_over_time': ('Sport', 'No of Countries'),
+    'athlete_over_time': ('ID', 'No of Athletes'),
+}
+
+# Every other field -> the part of the summary that builds it
+_PARTS = {
+    'editions': key_statistics, 'cities': key_statistics, 'sports': key_statistics,
+    'events': key_statistics, 'athletes': key_statistics, 'nations': key_statistics,
+    'country_medals': year_region_sex, 'gender_over_time': year_region_sex, 'gender_map_data': year_region_sex,
+    'sport_count': sport_tables, 'events_heatmap': sport_tables,
+    'top_athletes': athlete_tables,
+}
+
+
+class OverallSummary:
+    # Every statistic the Overall Analysis page shows, built once per dataset
+    # version. Each part above is its own derived table of the store, built on
+    # the first read of one of its fields, so the page's charts fetch their
+    # data concurrently (pipelines.py) and each waits only for the part it
+    # reads. The grouped counts come from the store's query backend, one pass
+    # over (Year, region, Sex) plus per-sport distinct counts.
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, field):
+        if field in _OVER_TIME:
+            return self._data.data_over_time(*_OVER_TIME[field])
+        part = _PARTS.get(field)
+        if part is None:
+            raise AttributeError(field)
+        return self._data.derived(f'summary_{part.__name__}', lambda df: part(self._data))[field]
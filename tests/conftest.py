@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_cache  # noqa: E402
+import store  # noqa: E402
+from benchmarks import generate  # noqa: E402
+
+# A few thousand rows of both seasons, same format as the real CSVs
+SCALE = 0.02
+
+
+@pytest.fixture(scope='session')
+def generated(tmp_path_factory):
+    # (athlete_path, region_path) of a generated dataset, preprocessed into a
+    # cache directory of its own
+    tmp = tmp_path_factory.mktemp('generated')
+    cache_dir, data_cache.CACHE_DIR = data_cache.CACHE_DIR, str(tmp / 'cache')
+    try:
+        yield generate.generate(str(tmp / 'data'), SCALE, seed=0)
+    finally:
+        data_cache.CACHE_DIR = cache_dir
+
+
+@pytest.fixture(scope='session')
+def load_store(generated):
+    # season -> a fresh DataStore over that season of the generated dataset
+    athlete_path, region_path = generated
+
+    def load(season):
+        version = data_cache.cache_key(athlete_path, region_path, season)
+        return store.DataStore(data_cache.load_preprocessed(athlete_path, region_path, season), version, season)
+    return load
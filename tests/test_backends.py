@@ -0,0 +1,35 @@
+import pytest
+
+import backends
+import preprocessor
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture(scope='module', params=preprocessor.SEASONS)
+def stores(request, load_store):
+    # (pandas backend, DuckDB backend) over one season of the generated dataset
+    data = load_store(request.param)
+    return backends.PandasBackend(data), backends.open_backend(data, 'duckdb')
+
+
+def test_country_year_list(stores):
+    reference, duck = stores
+    assert reference.country_year_list() == duck.country_year_list()
+
+
+def test_every_query_matches(stores):
+    reference, duck = stores
+    calls = backends.parity_queries(reference.country_year_list()[0])
+    assert len(calls) > 20
+    for query, args in calls:
+        try:
+            backends.assert_same_result(getattr(reference, query)(*args), getattr(duck, query)(*args))
+        except AssertionError as e:
+            raise AssertionError(f"{query}{args}: {e}") from None
+
+
+def test_medal_counts_are_integers(stores):
+    _, duck = stores
+    counts = duck.year_region_counts()
+    assert all(dtype.kind == 'i' for dtype in counts.dtypes)
@@ -0,0 +1,39 @@
+import os
+
+import figure_cache
+
+
+def _cache(tmp_path, max_disk_bytes):
+    return figure_cache.FigureCache(max_bytes=0, disk_dir=str(tmp_path), max_disk_bytes=max_disk_bytes)
+
+
+def _age(cache, key, mtime):
+    os.utime(cache._disk_path(key, '.png'), (mtime, mtime))
+
+
+def test_disk_tier_stays_within_budget(tmp_path):
+    cache = _cache(tmp_path, 1000)
+    for i in range(20):
+        cache.put(('view', i), bytes(100))
+    assert sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)) <= 1000
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, 400)
+    for i in range(4):
+        cache.put(('view', i), bytes(100))
+        _age(cache, ('view', i), 1000 + i)
+    # Reading the oldest figure makes it the most recently used
+    assert cache.get(('view', 0)) == bytes(100)
+
+    cache.put(('view', 4), bytes(100))
+    assert cache.get(('view', 0)) is not None
+    assert cache.get(('view', 4)) is not None
+    assert cache.get(('view', 1)) is None
+    assert cache.get(('view', 2)) is None
+
+
+def test_payload_over_budget_is_not_written(tmp_path):
+    cache = _cache(tmp_path, 100)
+    cache.put(('view', 0), bytes(200))
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+import backends
+import preprocessor
+import store
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'duckdb'])
+@pytest.mark.parametrize('season', preprocessor.SEASONS)
+def test_append_matches_rebuild(generated, monkeypatch, season, backend):
+    if backend == 'duckdb':
+        pytest.importorskip("duckdb")
+    monkeypatch.setattr(backends, 'BACKEND', backend)
+    athlete_path, region_path = generated
+    athlete_df, region_df = pd.read_csv(athlete_path), pd.read_csv(region_path)
+
+    # The store without the season's last edition, then that edition appended.
+    # The CSV interleaves editions, so the rebuild's row order differs.
+    last = athlete_df.loc[athlete_df['Season'] == season, 'Year'].max()
+    edition = athlete_df['Year'] == last
+    data = store.DataStore(preprocessor.preprocess(athlete_df[~edition], region_df, season),
+                           f'test-append-{season}-{backend}', season)
+    data.medal_cube()
+    data.append_edition(athlete_df[edition], region_df)
+
+    assert last in data.country_year_list()[1]
+    store.verify_append(data, athlete_df, region_df)
+
+
+def test_append_rejects_known_years(generated):
+    athlete_path, region_path = generated
+    athlete_df, region_df = pd.read_csv(athlete_path), pd.read_csv(region_path)
+    data = store.DataStore(preprocessor.preprocess(athlete_df, region_df), 'test-append-known')
+    with pytest.raises(ValueError):
+        data.append_edition(athlete_df[athlete_df['Year'] == athlete_df['Year'].max()], region_df)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import helper
+import incremental
+import ingest
+import preprocessor
+
+
+@pytest.fixture(scope='module', params=preprocessor.SEASONS)
+def ingested(request, generated, load_store, tmp_path_factory):
+    # (ingested directory, preprocess() of the same CSV, its DataStore), with
+    # chunks small enough that duplicates cross chunk boundaries
+    athlete_path, region_path = generated
+    season = request.param
+    out_dir = str(tmp_path_factory.mktemp(f'ingest-{season}'))
+    ingest.ingest_csv(athlete_path, region_path, out_dir, chunksize=500, season=season)
+    expected = preprocessor.preprocess(pd.read_csv(athlete_path), pd.read_csv(region_path), season)
+    return out_dir, expected, load_store(season)
+
+
+def test_read_ingested_matches_preprocess(ingested):
+    out_dir, expected, _ = ingested
+    pd.testing.assert_frame_equal(ingest.read_ingested(out_dir), expected)
+
+
+def test_aggregates_match_store(ingested):
+    out_dir, _, data = ingested
+    aggregates = ingest.read_aggregates(out_dir)
+    assert aggregates.country_year_list() == data.country_year_list()
+    for col in helper.OVER_TIME_COLUMNS:
+        incremental.assert_same_frame(aggregates.over_time(col, col), data.data_over_time(col, col))
+
+    a, b = aggregates.medal_cube(), data.medal_cube()
+    incremental.assert_same_frame(a.overall, b.overall)
+    assert a.by_year.keys() == b.by_year.keys() and a.by_region.keys() == b.by_region.keys()
+    for year in b.by_year:
+        incremental.assert_same_frame(a.by_year[year], b.by_year[year])
+    for region in b.by_region:
+        incremental.assert_same_frame(a.by_region[region], b.by_region[region])
+
+
+def test_seen_rows_across_chunks():
+    seen = ingest._SeenRows()
+    df = pd.DataFrame({'a': [3, 1, 2, 1], 'b': ['z', 'x', 'y', 'x']})
+    assert seen.first_seen(df).tolist() == [True, True, True, False]
+    more = pd.DataFrame({'a': [2, 4, 0], 'b': ['y', 'w', 'v']})
+    assert seen.first_seen(more).tolist() == [False, True, True]
+    assert len(seen._hashes) == 5 and np.all(seen._hashes[:-1] < seen._hashes[1:])
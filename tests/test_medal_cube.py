@@ -0,0 +1,53 @@
+import pytest
+
+import helper
+import incremental
+import preprocessor
+from medal_cube import TALLY_COLUMNS
+
+
+def _groupby_tally(df, year, country):
+    # fetch_medal_tally as it was before the cube: filter the medal events,
+    # then group. Ties on Gold keep the groupby's region order, as the cube's do.
+    medal_df = df.drop_duplicates(subset=['Team', 'NOC', 'Medal', 'Games', 'Year', 'City', 'Sport', 'Event'])
+    if year != 'Overall':
+        medal_df = medal_df[medal_df['Year'] == year]
+    if country != 'Overall':
+        medal_df = medal_df[medal_df['region'] == country]
+    if medal_df.empty:
+        return None
+
+    if year == 'Overall' and country != 'Overall':
+        x = medal_df.groupby('Year')[['Gold', 'Bronze', 'Silver']].sum().sort_values('Year').reset_index()
+    else:
+        x = (medal_df.groupby('region', observed=True)[['Gold', 'Bronze', 'Silver']].sum()
+             .sort_values('Gold', ascending=False, kind='stable').reset_index())
+    x['Total'] = x['Gold'] + x['Silver'] + x['Bronze']
+    return x
+
+
+@pytest.fixture(scope='module', params=preprocessor.SEASONS)
+def data(request, load_store):
+    return load_store(request.param)
+
+
+def test_fetch_medal_tally_matches_groupby(data):
+    cube, df = data.medal_cube(), data.df
+    countries, years = data.country_year_list()
+    # Every branch: all years and regions on their own, and each year with a
+    # few regions (some of which won nothing that year) plus an unknown one
+    views = [(year, 'Overall') for year in years] + [('Overall', country) for country in countries[1:]]
+    views += [(year, country) for year in years[1:] for country in countries[1:6] + ['Atlantis']]
+
+    for year, country in views:
+        got = helper.fetch_medal_tally(cube, year, country)
+        expected = _groupby_tally(df, year, country)
+        if expected is None:
+            assert got.empty and list(got.columns) == ['Gold', 'Silver', 'Bronze', 'Total'], (year, country)
+            continue
+        assert list(got.columns[-4:]) == TALLY_COLUMNS
+        assert all(got[col].dtype.kind == 'i' for col in TALLY_COLUMNS)
+        try:
+            incremental.assert_same_frame(got, expected)
+        except AssertionError as e:
+            raise AssertionError(f"{year}, {country}: {e}") from None
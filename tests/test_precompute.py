@@ -0,0 +1,32 @@
+import matplotlib
+import pytest
+
+import country_wise_analysis
+import figure_cache
+import precompute
+
+matplotlib.use('Agg')
+
+
+@pytest.fixture
+def figures(tmp_path, monkeypatch):
+    # An empty figure cache whose disk tier lives in tmp_path
+    monkeypatch.setattr(figure_cache, 'cache', figure_cache.FigureCache(disk_dir=str(tmp_path)))
+    return figure_cache.cache
+
+
+def test_warm_country_without_medals(load_store, figures):
+    data = load_store('Winter')
+    countries = data.country_year_list()[0][1:]
+    without = [c for c in countries if not country_wise_analysis.country_has_medals(data, c)]
+    assert without, "the generated Winter data has regions that never won a medal"
+
+    built = precompute.warm_country(data, without[0])
+    assert built == len(country_wise_analysis.COUNTRY_FIGURES) - len(country_wise_analysis.MEDAL_FIGURES)
+    assert precompute.warm_country(data, without[0]) == 0
+
+
+def test_warm_country_with_medals(load_store, figures):
+    data = load_store('Summer')
+    country = next(c for c in data.country_year_list()[0][1:] if country_wise_analysis.country_has_medals(data, c))
+    assert precompute.warm_country(data, country) == len(country_wise_analysis.COUNTRY_FIGURES)